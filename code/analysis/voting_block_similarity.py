@@ -7,55 +7,84 @@ Compares seasons by aligning post-merge tribals by voter count and computing
 Euclidean distance between voting block proportions.
 """
 
-import json
+import csv
+import orjson
 import numpy as np
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from collections import Counter
-from itertools import combinations
 
 DATA_DIR = Path("../../docs/data")
 
-def get_voting_blocks(tc: dict) -> tuple[int, list[float]]:
+# Shared result for TCs with no first-round votes
+_NO_BLOCKS = np.empty(0, dtype=np.float32)
+_NO_BLOCKS.flags.writeable = False
+
+# Post-merge (num_voters, proportions) per TC, in TC order
+SeasonProfile = list[tuple[int, np.ndarray]]
+
+def blocks_from_targets(targets: np.ndarray) -> tuple[int, np.ndarray]:
+    """
+    Turn integer-coded vote targets into descending voting block proportions.
+    """
+    if len(targets) == 0:
+        return (0, _NO_BLOCKS)
+    
+    # One fresh array for the result; sort and normalize it in place
+    counts = np.bincount(targets)
+    blocks = counts[counts > 0].astype(np.float32)
+    blocks.sort()
+    blocks = blocks[::-1]
+    
+    num_voters = len(targets)
+    blocks /= num_voters
+    return (num_voters, blocks)
+
+
+def get_voting_blocks(tc: dict, target_codes: dict[str, int] | None = None) -> tuple[int, np.ndarray]:
     """
     Extract voting block proportions from a tribal council.
     
+    Args:
+        tc: Tribal council dict from a season voting flow file
+        target_codes: Optional target_id -> int code map, shared across a season's
+            TCs so each ID is only encoded once
+    
     Returns:
         (num_voters, proportions) where proportions is sorted descending
-        e.g., (8, [0.5, 0.375, 0.125]) for a 4-3-1 vote
+        e.g., (8, array([0.5, 0.375, 0.125])) for a 4-3-1 vote
     """
-    # Only count first round votes (exclude revotes)
-    votes_r1 = [v for v in tc['votes'] if v.get('vote_round', 1) == 1]
-    
-    if not votes_r1:
-        return (0, [])
+    if target_codes is None:
+        target_codes = {}
     
-    # Count votes by target
-    vote_counts = Counter(v['target_id'] for v in votes_r1)
-    blocks = sorted(vote_counts.values(), reverse=True)
-    
-    num_voters = sum(blocks)
-    proportions = [b / num_voters for b in blocks]
-    
-    return (num_voters, proportions)
+    # Only count first round votes (exclude revotes)
+    targets = np.fromiter(
+        (
+            target_codes.setdefault(v['target_id'], len(target_codes))
+            for v in tc['votes'] if v.get('vote_round', 1) == 1
+        ),
+        dtype=np.intp
+    )
+    
+    return blocks_from_targets(targets)
 
 
-def get_season_voting_profile(season_file: Path) -> list[tuple[int, list[float]]]:
+def get_season_voting_profile(season_file: Path) -> SeasonProfile:
     """
     Get all post-merge voting block profiles for a season.
     
     Returns list of (num_voters, proportions) tuples, ordered by TC.
     """
-    with open(season_file) as f:
-        data = json.load(f)
+    data = orjson.loads(season_file.read_bytes())
     
-    profiles = []
+    profiles: SeasonProfile = []
+    target_codes: dict[str, int] = {}
     for tc in data['tribal_councils']:
         # Only post-merge
         if tc.get('tribe_status') != 'Merged':
             continue
         
-        num_voters, proportions = get_voting_blocks(tc)
+        num_voters, proportions = get_voting_blocks(tc, target_codes)
         
         # Skip TCs with no votes (fire challenge, etc.)
         if num_voters > 0:
@@ -64,63 +93,114 @@ def get_season_voting_profile(season_file: Path) -> list[tuple[int, list[float]]
     return profiles
 
 
-def pad_proportions(p1: list[float], p2: list[float]) -> tuple[np.ndarray, np.ndarray]:
-    """Pad two proportion lists to same length with zeros."""
-    max_len = max(len(p1), len(p2))
-    v1 = np.array(p1 + [0] * (max_len - len(p1)))
-    v2 = np.array(p2 + [0] * (max_len - len(p2)))
-    return v1, v2
+def build_voter_buckets(profiles: list[SeasonProfile]) -> dict[int, tuple[np.ndarray, np.ndarray]]:
+    """
+    Regroup season profiles by voter count.
+    
+    If a season has multiple TCs with the same voter count, use the first one.
+    
+    Returns:
+        {num_voters: (season_idx, proportions)} ordered by voter count descending,
+        where proportions has one zero-padded row per season in season_idx
+    """
+    rows: dict[int, dict[int, np.ndarray]] = {}
+    for i, profile in enumerate(profiles):
+        for num_voters, props in profile:
+            bucket = rows.setdefault(num_voters, {})
+            if i not in bucket:
+                bucket[i] = props
+    
+    buckets: dict[int, tuple[np.ndarray, np.ndarray]] = {}
+    for k in sorted(rows, reverse=True):
+        season_idx = np.fromiter(rows[k].keys(), dtype=np.intp, count=len(rows[k]))
+        M = np.zeros((len(season_idx), k), dtype=np.float32)
+        for row, props in enumerate(rows[k].values()):
+            M[row, :len(props)] = props
+        buckets[k] = (season_idx, M)
+    
+    return buckets
 
 
-def euclidean_distance(p1: list[float], p2: list[float]) -> float:
-    """Calculate Euclidean distance between two proportion vectors."""
-    v1, v2 = pad_proportions(p1, p2)
-    return np.sqrt(np.sum((v1 - v2) ** 2))
+def euclidean_distance_matrix(M: np.ndarray) -> np.ndarray:
+    """
+    Pairwise Euclidean distances between the rows of M.
+    
+    Identical rows (common for lopsided votes like 4-0) are collapsed first, so
+    they get an exact zero distance and the product only covers unique rows.
+    Uses ||a - b||^2 = ||a||^2 + ||b||^2 - 2 a.b so the work is a single matrix
+    product. Computed in float64 to keep cancellation error small for nearly
+    identical rows.
+    """
+    unique_rows, inverse = np.unique(M, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    
+    U = unique_rows.astype(np.float64)
+    sq_norms = np.einsum('ij,ij->i', U, U)
+    D = U @ U.T
+    D *= -2
+    D += sq_norms[:, None]
+    D += sq_norms[None, :]
+    np.maximum(D, 0, out=D)
+    np.sqrt(D, out=D)
+    np.fill_diagonal(D, 0.0)
+    return D[np.ix_(inverse, inverse)]
 
 
-def compare_seasons(profile1: list, profile2: list) -> tuple[float, int]:
+def pairwise_season_distances(profiles: list[SeasonProfile]) -> tuple[np.ndarray, np.ndarray]:
     """
-    Compare two seasons by aligning on voter count.
+    Compare all seasons at once by aligning on voter count.
     
-    Finds the first common voter count and compares from there.
+    For each voter count, one matrix product over that bucket's proportion
+    matrix gives the Euclidean distance for every pair of seasons in it.
     
     Returns:
-        (total_distance, num_compared) - total Euclidean distance and number of TCs compared
+        (distance_matrix, comparison_counts) - average Euclidean distance per
+        compared TC (inf where no voter counts overlap) and number of TCs compared
     """
-    # Create lookup by voter count
-    # If multiple TCs have same voter count, use the first one
-    by_voters1 = {}
-    for num_voters, props in profile1:
-        if num_voters not in by_voters1:
-            by_voters1[num_voters] = props
+    n = len(profiles)
+    total_distance = np.zeros((n, n))
+    comparison_counts = np.zeros((n, n), dtype=np.int32)
     
-    by_voters2 = {}
-    for num_voters, props in profile2:
-        if num_voters not in by_voters2:
-            by_voters2[num_voters] = props
-    
-    # Find common voter counts
-    common_counts = set(by_voters1.keys()) & set(by_voters2.keys())
+    for season_idx, M in build_voter_buckets(profiles).values():
+        if len(season_idx) < 2:
+            continue
+        block = np.ix_(season_idx, season_idx)
+        total_distance[block] += euclidean_distance_matrix(M)
+        comparison_counts[block] += 1
     
-    if not common_counts:
-        return (float('inf'), 0)
+    np.fill_diagonal(comparison_counts, 0)
     
-    # Calculate distance for each common voter count
-    total_distance = 0
-    for count in sorted(common_counts, reverse=True):
-        dist = euclidean_distance(by_voters1[count], by_voters2[count])
-        total_distance += dist
+    # Normalize by number of comparisons
+    distance_matrix = np.full((n, n), np.inf)
+    np.divide(total_distance, comparison_counts, out=distance_matrix, where=comparison_counts > 0)
+    np.fill_diagonal(distance_matrix, 0.0)
     
-    return (total_distance, len(common_counts))
+    return distance_matrix, comparison_counts
+
+
+def write_matrix_csv(path: Path, matrix: np.ndarray, labels: list[str]) -> None:
+    """Write a square matrix as CSV with labels as both header and index column."""
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow([''] + labels)
+        for label, row in zip(labels, matrix.tolist()):
+            writer.writerow([label] + row)
 
 
 def main():
     # Load all seasons
     print("Loading seasons...")
+    # The manifest written by generate_all_seasons.py lists every generated season
+    manifest = orjson.loads((DATA_DIR / "seasons_manifest.json").read_bytes())
+    entries = sorted(manifest['seasons'], key=lambda s: int(s['id'][2:]))
+    
+    # Overlap file reads across seasons
+    with ThreadPoolExecutor() as executor:
+        profiles = executor.map(get_season_voting_profile, [DATA_DIR / s['file'] for s in entries])
+    
     seasons = {}
-    for season_file in sorted(DATA_DIR.glob("us*_voting_flow.json")):
-        season_id = season_file.stem.replace("_voting_flow", "")
-        profile = get_season_voting_profile(season_file)
+    for entry, profile in zip(entries, profiles):
+        season_id = entry['id']
         if profile:  # Only include seasons with post-merge data
             seasons[season_id] = profile
             print(f"  {season_id}: {len(profile)} post-merge TCs")
@@ -138,87 +218,79 @@ def main():
     season_ids = sorted(seasons.keys())
     n = len(season_ids)
     
-    distance_matrix = np.zeros((n, n))
-    comparison_counts = np.zeros((n, n), dtype=int)
-    
-    for i, s1 in enumerate(season_ids):
-        for j, s2 in enumerate(season_ids):
-            if i < j:
-                dist, count = compare_seasons(seasons[s1], seasons[s2])
-                # Normalize by number of comparisons
-                avg_dist = dist / count if count > 0 else float('inf')
-                distance_matrix[i, j] = avg_dist
-                distance_matrix[j, i] = avg_dist
-                comparison_counts[i, j] = count
-                comparison_counts[j, i] = count
+    distance_matrix, comparison_counts = pairwise_season_distances(
+        [seasons[s] for s in season_ids]
+    )
     
     # Find max comparisons for coverage penalty
-    max_comparisons = np.max(comparison_counts)
+    max_comparisons = max(int(np.max(comparison_counts)), 1)
     
     # Convert distances to similarity percentages with coverage penalty
     # Raw similarity: (1 - distance) * 100
     # Coverage factor: (num_compared / max_compared) ^ 0.5
     # This penalizes seasons with less overlap in game stages
-    raw_similarity = (1 - distance_matrix) * 100
-    coverage_factor = np.power(comparison_counts / max_comparisons, 0.5)
-    similarity_matrix = raw_similarity * coverage_factor
+    # Computed in place to avoid an intermediate (n, n) buffer per operation
+    raw_similarity = np.subtract(1.0, distance_matrix)
+    raw_similarity *= 100
+    coverage_factor = np.divide(comparison_counts, max_comparisons)
+    np.sqrt(coverage_factor, out=coverage_factor)
     
-    # Ensure diagonal is 100%
-    np.fill_diagonal(similarity_matrix, 100.0)
+    # Diagonal is 100% by definition; only fill in the off-diagonal pairs
+    similarity_matrix = np.full((n, n), 100.0)
+    np.multiply(raw_similarity, coverage_factor, out=similarity_matrix, where=~np.eye(n, dtype=bool))
     
     print(f"\nMax comparisons across pairs: {max_comparisons}")
     
     # Find most similar pairs
     print("\n=== Most Similar Season Pairs ===")
-    pairs = []
-    for i, s1 in enumerate(season_ids):
-        for j, s2 in enumerate(season_ids):
-            if i < j:
-                sim_pct = similarity_matrix[i, j]
-                raw_sim = raw_similarity[i, j]
-                pairs.append((s1, s2, sim_pct, comparison_counts[i, j], raw_sim))
-    
-    pairs.sort(key=lambda x: x[2], reverse=True)  # Sort by similarity descending
+    i_idx, j_idx = np.triu_indices(n, 1)
+    # Stable sort keeps pair order for ties, by similarity descending
+    order = np.argsort(-similarity_matrix[i_idx, j_idx], kind='stable')
+    
+    def print_pair(k):
+        i, j = i_idx[k], j_idx[k]
+        s1_num = int(season_ids[i].replace('us', ''))
+        s2_num = int(season_ids[j].replace('us', ''))
+        sim = similarity_matrix[i, j]
+        count = comparison_counts[i, j]
+        raw = raw_similarity[i, j]
+        print(f"  {sim:.1f}%: Season {s1_num} vs Season {s2_num} ({count} TCs, raw: {raw:.1f}%)")
     
     print("(Higher % = more similar voting patterns)")
     print("(Similarity is penalized for fewer overlapping game stages)\n")
-    for s1, s2, sim, count, raw in pairs[:15]:
-        s1_num = int(s1.replace('us', ''))
-        s2_num = int(s2.replace('us', ''))
-        print(f"  {sim:.1f}%: Season {s1_num} vs Season {s2_num} ({count} TCs, raw: {raw:.1f}%)")
+    for k in order[:15]:
+        print_pair(k)
     
     print("\n=== Most Different Season Pairs ===")
-    for s1, s2, sim, count, raw in pairs[-10:]:
-        s1_num = int(s1.replace('us', ''))
-        s2_num = int(s2.replace('us', ''))
-        print(f"  {sim:.1f}%: Season {s1_num} vs Season {s2_num} ({count} TCs, raw: {raw:.1f}%)")
+    for k in order[-10:]:
+        print_pair(k)
     
     # Save full matrix (both distance and similarity)
-    dist_df = pd.DataFrame(distance_matrix, index=season_ids, columns=season_ids)
-    sim_df = pd.DataFrame(similarity_matrix, index=season_ids, columns=season_ids)
-    
     dist_output_path = DATA_DIR / "season_distance_matrix.csv"
-    dist_df.to_csv(dist_output_path)
+    write_matrix_csv(dist_output_path, distance_matrix, season_ids)
     print(f"\nDistance matrix saved to: {dist_output_path}")
     
     sim_output_path = DATA_DIR / "season_similarity_matrix.csv"
-    sim_df.to_csv(sim_output_path)
+    write_matrix_csv(sim_output_path, similarity_matrix, season_ids)
     print(f"Similarity matrix saved to: {sim_output_path}")
     
     # Also save as JSON for visualization
     output_json = {
         "seasons": season_ids,
-        "distance_matrix": distance_matrix.tolist(),
-        "similarity_matrix": similarity_matrix.tolist(),
-        "raw_similarity_matrix": raw_similarity.tolist(),
-        "comparison_counts": comparison_counts.tolist(),
+        "distance_matrix": distance_matrix,
+        "similarity_matrix": similarity_matrix,
+        "raw_similarity_matrix": raw_similarity,
+        "comparison_counts": comparison_counts,
         "max_comparisons": int(max_comparisons)
     }
     json_path = DATA_DIR / "season_similarity.json"
-    with open(json_path, 'w') as f:
-        json.dump(output_json, f, indent=2)
+    # orjson serializes the NumPy matrices directly, without .tolist() copies
+    json_path.write_bytes(
+        orjson.dumps(output_json, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+    )
     print(f"JSON data saved to: {json_path}")
     
+    sim_df = pd.DataFrame(similarity_matrix, index=season_ids, columns=season_ids)
     return sim_df, seasons
 
 
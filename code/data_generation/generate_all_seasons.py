@@ -3,16 +3,35 @@
 Batch generate voting flow JSON for all US Survivor seasons.
 """
 
-import subprocess
-import sys
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
+from generate_voting_flow import load_data, process_season, split_by_season, write_season_json
+
 DATA_DIR = "../../survivoR_data"
 OUTPUT_DIR = "../../docs/data"
 
 # All US seasons
 SEASONS = [f"US{i:02d}" for i in range(1, 50)]
 
+
+def _init_worker():
+    """Pay the heavy imports once per worker instead of on the first season it runs."""
+    import numpy
+    import pandas
+
+
+def _run_one(season: str, *season_dfs) -> tuple[str, bool, str]:
+    """Generate a single season from its own slices of the source tables."""
+    try:
+        season_data = process_season(season, *season_dfs)
+        write_season_json(season_data, OUTPUT_DIR)
+        return season, True, ""
+    except Exception as e:
+        return season, False, str(e)
+
+
 def main():
     output_path = Path(OUTPUT_DIR)
     output_path.mkdir(exist_ok=True)
@@ -20,29 +39,24 @@ def main():
     success = []
     failed = []
     
-    for season in SEASONS:
-        print(f"Generating {season}...", end=" ", flush=True)
-        try:
-            result = subprocess.run(
-                [
-                    sys.executable,
-                    "generate_voting_flow.py",
-                    "--data-dir", DATA_DIR,
-                    "--output-dir", OUTPUT_DIR,
-                    "--season", season
-                ],
-                capture_output=True,
-                text=True
-            )
-            if result.returncode == 0:
-                print("✓")
+    # Parse and split once here; each worker is sent only its season's slices
+    season_dfs = split_by_season(load_data(DATA_DIR), SEASONS)
+    
+    # Seasons are independent, so run them across all cores
+    with ProcessPoolExecutor(max_workers=os.cpu_count(), initializer=_init_worker) as executor:
+        futures = {executor.submit(_run_one, season, *season_dfs[season]): season for season in SEASONS}
+        for future in as_completed(futures):
+            season, ok, error = future.result()
+            if ok:
+                print(f"Generating {season}... ✓", flush=True)
                 success.append(season)
             else:
-                print(f"✗ - {result.stderr.strip()}")
-                failed.append((season, result.stderr.strip()))
-        except Exception as e:
-            print(f"✗ - {e}")
-            failed.append((season, str(e)))
+                print(f"Generating {season}... ✗ - {error}", flush=True)
+                failed.append((season, error))
+    
+    # Completion order is arbitrary; keep the manifest in season order
+    success.sort()
+    failed.sort()
     
     print(f"\n{'='*50}")
     print(f"Generated: {len(success)}/{len(SEASONS)} seasons")
@@ -8,87 +8,407 @@ Target: Whether that player was eliminated at that tribal.
 
 import pandas as pd
 import numpy as np
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
 DATA_DIR = "../../survivoR_data"
 OUTPUT_DIR = "../../docs/data"
 
 def age_bucket(age):
-    if pd.isna(age):
-        return None
-    if age <= 24:
-        return '18-24'
-    elif age <= 29:
-        return '25-29'
-    elif age <= 39:
-        return '30-39'
-    elif age <= 49:
-        return '40-49'
+    """Bucket a Series of ages; missing ages stay missing."""
+    return pd.cut(
+        age,
+        bins=[-np.inf, 24, 29, 39, 49, np.inf],
+        labels=['18-24', '25-29', '30-39', '40-49', '50+']
+    )
+
+def race_cat(df):
+    """Single race category per row, checked in priority order."""
+    conditions = [
+        df['african'] == True,
+        df['asian'] == True,
+        df['latin_american'] == True,
+        df['native_american'] == True,
+        df['bipoc'] == False,
+    ]
+    choices = ['Black', 'Asian', 'Latino/Hispanic', 'Native American', 'White']
+    return np.select(conditions, choices, default=None)
+
+def cumulative_by_episode(events, id_col, last_episode, value_col=None, distinct_episodes=False):
+    """
+    Running per-castaway totals by episode.
+    
+    Returns an array with one row per category code of id_col and one column per
+    episode from -3 to last_episode; each cell is the total of value_col (or the
+    number of rows, or with distinct_episodes the number of episodes with any
+    rows) up to and including that episode.
+    """
+    width = last_episode + 4
+    n_cells = len(events[id_col].cat.categories) * width
+    codes = events[id_col].cat.codes.to_numpy().astype(np.int64)
+    episodes = events['episode'].to_numpy()
+    keep = (codes >= 0) & (episodes >= -3) & (episodes <= last_episode)
+    # Flat (castaway code, episode) cell for every event, summed by bincount
+    cells = codes[keep] * width + episodes[keep] + 3
+    if value_col is None:
+        table = np.bincount(cells, minlength=n_cells)
     else:
-        return '50+'
+        values = events[value_col].fillna(0).to_numpy()[keep]
+        table = np.bincount(cells, weights=values, minlength=n_cells)
+        if values.dtype.kind in 'biu':
+            table = table.astype(np.int64)
+    if distinct_episodes:
+        table = (table > 0).astype(int)
+    return table.reshape(-1, width).cumsum(axis=1)
 
-def race_cat(row):
-    if row.get('african') == True:
-        return 'Black'
-    elif row.get('asian') == True:
-        return 'Asian'
-    elif row.get('latin_american') == True:
-        return 'Latino/Hispanic'
-    elif row.get('native_american') == True:
-        return 'Native American'
-    elif row.get('bipoc') == False:
-        return 'White'
-    return None
+def prior_window_totals(cumulative, episode, castaway_ids):
+    """
+    Totals for each castaway over the previous 1, 2 and 3 episodes and over all
+    episodes before `episode`, from a cumulative_by_episode table.
+    """
+    rows = cumulative[castaway_ids.cat.codes.to_numpy()]
+    # Column e + 3 holds the running total through episode e
+    before = rows[:, episode + 2]
+    return (
+        before - rows[:, episode + 1],
+        before - rows[:, episode],
+        before - rows[:, episode - 1],
+        before,
+    )
 
-def calculate_voting_accuracy(player_votes_df, voted_out_lookup, episode, lookback_episodes):
+def prior_window_rates(numerators, denominators, episode, castaway_ids):
     """
-    Calculate voting accuracy for a player over specified episodes.
-    Returns (correct_votes, total_votes, accuracy)
+    Ratio of two cumulative_by_episode tables over the same windows as
+    prior_window_totals, with 0.0 wherever the denominator is zero.
     """
-    relevant_eps = [episode - i for i in range(1, lookback_episodes + 1)]
-    player_ep_votes = player_votes_df[player_votes_df['episode'].isin(relevant_eps)]
+    rates = []
+    for num, den in zip(prior_window_totals(numerators, episode, castaway_ids),
+                        prior_window_totals(denominators, episode, castaway_ids)):
+        rates.append(np.divide(num, den, out=np.zeros(len(num)), where=den > 0))
+    return rates
+
+@lru_cache(maxsize=None)
+def categorize_advantage(adv_type):
+    """Map an advantage type to the holder category tracked as a feature."""
+    if pd.isna(adv_type):
+        return 'other'
+    adv_type = adv_type.lower()
+    if 'idol' in adv_type and 'nullifier' not in adv_type:
+        return 'idol'
+    elif 'extra vote' in adv_type or 'bank' in adv_type:
+        return 'extra_vote'
+    elif 'steal' in adv_type:
+        return 'steal_vote'
+    elif 'block' in adv_type or 'vote blocker' in adv_type:
+        return 'block_vote'
+    elif 'nullifier' in adv_type:
+        return 'idol_nullifier'
+    else:
+        return 'other'
+
+def new_advantage_holders():
+    """Empty holder sets for each advantage category."""
+    return {
+        'idol': set(),
+        'extra_vote': set(),
+        'steal_vote': set(),
+        'block_vote': set(),
+        'idol_nullifier': set(),
+        'other': set()
+    }
+
+def process_season(season, season_castaways, season_votes, season_conf, season_challenges,
+                   season_advantages, season_adv_details, season_tribes):
+    """Build the training rows for one season, one DataFrame per tribal."""
+    print(f"Processing Season {season}...")
+    training_frames = []
+    
+    # Advantage id -> holder category (first listing of an id wins)
+    adv_types = season_adv_details.drop_duplicates('advantage_id')
+    advantage_categories = {
+        adv_id: categorize_advantage(adv_type)
+        for adv_id, adv_type in zip(adv_types['advantage_id'], adv_types['advantage_type'])
+    }
+    
+    # Build lookup for who was voted out at each tribal
+    # (if an episode/tribe has several boots, the last one listed wins)
+    voted_out_lookup = (
+        season_votes.loc[season_votes['voted_out_id'].notna(), ['episode', 'tribe', 'voted_out_id']]
+        .drop_duplicates(['episode', 'tribe'], keep='last')
+        .set_index(['episode', 'tribe'])['voted_out_id']
+    )
+    
+    # Get all tribal councils (unique episode + vote_event combinations where someone was voted out)
+    tribal_councils = season_votes[season_votes['voted_out'].notna()][
+        ['episode', 'day', 'tribe', 'voted_out', 'voted_out_id']
+    ].drop_duplicates()
+    
+    # ONLY include post-merge tribal councils: episodes where any player has 'Merged' status
+    merged_episodes = season_tribes.loc[season_tribes['tribe_status'] == 'Merged', 'episode'].unique()
+    tribal_councils = tribal_councils[tribal_councils['episode'].isin(merged_episodes)]
+    
+    # Mark which cast votes went to the person actually voted out at that tribal
+    votes_cast = season_votes.join(voted_out_lookup.rename('actual_voted_out'), on=['episode', 'tribe'])
+    votes_cast['voted'] = votes_cast['vote_id'].notna()
+    votes_cast['correct'] = votes_cast['voted'] & (votes_cast['vote_id'] == votes_cast['actual_voted_out'])
+    
+    # Running per-castaway totals by episode, sliced per tribal below
+    last_episode = int(tribal_councils['episode'].max()) if len(tribal_councils) > 0 else 0
+    conf_counts = cumulative_by_episode(season_conf, 'castaway_id', last_episode, 'confessional_count')
+    conf_times = cumulative_by_episode(season_conf, 'castaway_id', last_episode, 'confessional_time')
+    votes_against = cumulative_by_episode(season_votes, 'vote_id', last_episode)
+    vote_episodes = cumulative_by_episode(season_votes, 'vote_id', last_episode, distinct_episodes=True)
+    individual_wins = cumulative_by_episode(
+        season_challenges[season_challenges['won'] == 1], 'castaway_id', last_episode
+    )
+    correct_votes = cumulative_by_episode(votes_cast, 'castaway_id', last_episode, 'correct')
+    votes_total = cumulative_by_episode(votes_cast, 'castaway_id', last_episode, 'voted')
+    # Tribe swaps (rows with a 'Swapped*' tribe_status)
+    tribe_swaps = cumulative_by_episode(
+        season_tribes[season_tribes['tribe_status'].str.contains('Swapped', na=False)],
+        'castaway_id', last_episode
+    )
+    
+    # Advantage events in episode order, replayed incrementally per tribal.
+    # Each event keeps its row position: a holder's state is set by the
+    # last listed event before the episode, as in a full replay.
+    adv_events = []
+    for pos, (adv_episode, adv_id, holder_id, event) in enumerate(zip(
+        season_advantages['episode'], season_advantages['advantage_id'],
+        season_advantages['castaway_id'], season_advantages['event']
+    )):
+        if pd.isna(adv_episode):
+            continue
+        event = str(event).lower()
+        if 'found' in event or 'received' in event or 'won' in event or 'bought' in event:
+            holds = True
+        elif 'played' in event or 'expired' in event or 'voted out' in event or 'destroyed' in event:
+            holds = False
+        else:
+            continue
+        category = advantage_categories.get(adv_id, 'other')
+        adv_events.append((adv_episode, pos, category, holder_id, holds))
+    adv_events.sort(key=lambda e: e[0])
+    advantage_holders = new_advantage_holders()
+    last_event_pos = {}
+    next_adv_idx = 0
+    replayed_through = -np.inf
+    
+    # Castaways ordered by elimination episode (never eliminated last), so the
+    # players still in at a tribal are a suffix found by binary search
+    elimination_episodes = season_castaways['episode'].fillna(np.inf).to_numpy()
+    by_elimination = np.argsort(elimination_episodes, kind='stable')
+    sorted_elimination_episodes = elimination_episodes[by_elimination]
+    
+    # Tribe members for each (episode, tribe) in the tribe mapping
+    tribe_members_at = {
+        key: group['castaway_id']
+        for key, group in season_tribes.groupby(['episode', 'tribe'], observed=True)
+    }
     
-    if len(player_ep_votes) == 0:
-        return 0, 0, 0.0
+    # Season-level mask, evaluated once instead of on every tribal
+    immunity_votes = season_votes[season_votes['immunity'] == 'Individual']
     
-    correct = 0
-    total = 0
-    for _, vote_row in player_ep_votes.iterrows():
-        ep = vote_row['episode']
-        vote_target = vote_row['vote_id']
+    # For each tribal council
+    for _, tribal in tribal_councils.iterrows():
+        episode = tribal['episode']
+        day = tribal['day']
+        tribe_at_tribal = tribal['tribe']
+        voted_out_id = tribal['voted_out_id']
         
-        # Skip if they didn't vote (NaN vote)
-        if pd.isna(vote_target):
+        # Determine who was still in the game at this tribal
+        # Players are "in" if their elimination episode is >= this episode
+        # or if they have no elimination episode (winners/finalists in later eps)
+        first_in = np.searchsorted(sorted_elimination_episodes, episode, side='left')
+        players_at_tribal = season_castaways.iloc[np.sort(by_elimination[first_in:])]
+        
+        # Filter to players at this specific tribal (same tribe for pre-merge)
+        tribe_members = tribe_members_at.get((episode, tribe_at_tribal))
+        if tribe_members is not None:
+            players_at_tribal = players_at_tribal[
+                players_at_tribal['castaway_id'].isin(tribe_members)
+            ]
+        
+        # Skip if no players found (data issue)
+        if len(players_at_tribal) == 0:
             continue
+        
+        players_remaining = len(players_at_tribal)
+        
+        # Get who has immunity at this tribal
+        immunity_holders = immunity_votes.loc[
+            (immunity_votes['episode'] == episode) &
+            (immunity_votes['tribe'] == tribe_at_tribal) &
+            (immunity_votes['voted_out_id'] == voted_out_id),
+            'castaway_id'
+        ]
+        
+        # Bring advantage holdings up to this episode; the replay only moves
+        # forward, so start over if tribals ever go back in time
+        if episode < replayed_through:
+            advantage_holders = new_advantage_holders()
+            last_event_pos = {}
+            next_adv_idx = 0
+        while next_adv_idx < len(adv_events) and adv_events[next_adv_idx][0] < episode:
+            _, pos, category, holder_id, holds = adv_events[next_adv_idx]
+            next_adv_idx += 1
+            if last_event_pos.get((category, holder_id), -1) > pos:
+                continue
+            last_event_pos[(category, holder_id)] = pos
+            if holds:
+                advantage_holders[category].add(holder_id)
+            else:
+                advantage_holders[category].discard(holder_id)
+        replayed_through = episode
+        
+        # Track all advantages in circulation (across all players)
+        total_advantages_in_play = 0
+        
+        # Count total advantages in circulation going into this episode
+        for category in advantage_holders:
+            total_advantages_in_play += len(advantage_holders[category])
+        
+        # Windowed history features for everyone at this tribal at once
+        castaway_ids = players_at_tribal['castaway_id']
+        (confessionals_prev_ep, confessionals_last_2_ep, confessionals_last_3_ep,
+         confessionals_cumulative) = prior_window_totals(conf_counts, episode, castaway_ids)
+        (confessional_time_prev_ep, confessional_time_last_2_ep, confessional_time_last_3_ep,
+         confessional_time_cumulative) = prior_window_totals(conf_times, episode, castaway_ids)
+        (votes_against_prev_ep, votes_against_last_2_ep, votes_against_last_3_ep,
+         votes_against_cumulative) = prior_window_totals(votes_against, episode, castaway_ids)
+        times_received_votes = prior_window_totals(vote_episodes, episode, castaway_ids)[3]
+        (individual_wins_prev_ep, individual_wins_last_2_ep, individual_wins_last_3_ep,
+         individual_wins_cumulative) = prior_window_totals(individual_wins, episode, castaway_ids)
+        (voting_accuracy_prev_ep, voting_accuracy_last_2_ep, voting_accuracy_last_3_ep,
+         voting_accuracy_cumulative) = prior_window_rates(correct_votes, votes_total, episode, castaway_ids)
+        
+        # Tribe swaps up to and including this episode
+        num_tribe_swaps = tribe_swaps[castaway_ids.cat.codes.to_numpy(), episode + 3]
+        
+        # One training row per player at this tribal, built column-wise
+        players = players_at_tribal.reset_index(drop=True)
+        tribal_rows = pd.DataFrame({
+            # Identifiers
+            'season': season,
+            'episode': episode,
+            'castaway_id': players['castaway_id'],
+            'castaway': players['castaway'],
+            'tribe': tribe_at_tribal,
+            
+            # Target
+            'eliminated': players['castaway_id'] == voted_out_id,
+            
+            # Confessional features
+            'confessionals_prev_ep': confessionals_prev_ep,
+            'confessionals_last_2_ep': confessionals_last_2_ep,
+            'confessionals_last_3_ep': confessionals_last_3_ep,
+            'confessionals_cumulative': confessionals_cumulative,
+            'confessional_time_prev_ep': confessional_time_prev_ep,
+            'confessional_time_last_2_ep': confessional_time_last_2_ep,
+            'confessional_time_last_3_ep': confessional_time_last_3_ep,
+            'confessional_time_cumulative': confessional_time_cumulative,
+            
+            # Vote features
+            'votes_against_prev_ep': votes_against_prev_ep,
+            'votes_against_last_2_ep': votes_against_last_2_ep,
+            'votes_against_last_3_ep': votes_against_last_3_ep,
+            'votes_against_cumulative': votes_against_cumulative,
+            'times_received_votes': times_received_votes,
             
-        total += 1
-        # Check if who they voted for was actually voted out
-        actual_voted_out = voted_out_lookup.get((ep, vote_row.get('tribe', '')))
-        if vote_target == actual_voted_out:
-            correct += 1
+            # Voting accuracy
+            'voting_accuracy_prev_ep': voting_accuracy_prev_ep,
+            'voting_accuracy_last_2_ep': voting_accuracy_last_2_ep,
+            'voting_accuracy_last_3_ep': voting_accuracy_last_3_ep,
+            'voting_accuracy_cumulative': voting_accuracy_cumulative,
+            
+            # Challenge features
+            'individual_wins_prev_ep': individual_wins_prev_ep,
+            'individual_wins_last_2_ep': individual_wins_last_2_ep,
+            'individual_wins_last_3_ep': individual_wins_last_3_ep,
+            'individual_wins_cumulative': individual_wins_cumulative,
+            'has_immunity_this_tribal': players['castaway_id'].isin(immunity_holders),
+            
+            # Tribe features
+            'num_tribe_swaps': num_tribe_swaps,
+            
+            # Advantage features
+            'has_idol': players['castaway_id'].isin(advantage_holders['idol']),
+            'has_extra_vote': players['castaway_id'].isin(advantage_holders['extra_vote']),
+            'has_steal_vote': players['castaway_id'].isin(advantage_holders['steal_vote']),
+            'has_block_vote': players['castaway_id'].isin(advantage_holders['block_vote']),
+            'has_idol_nullifier': players['castaway_id'].isin(advantage_holders['idol_nullifier']),
+            'has_other_advantage': players['castaway_id'].isin(advantage_holders['other']),
+            'advantages_in_circulation': total_advantages_in_play,
+            
+            # Game state
+            'players_remaining': players_remaining,
+            'day': day,
+            
+            # Demographics
+            'gender': players['gender'],
+            'age': players['age'],
+            'age_bucket': players['age_bucket'],
+            'race_cat': players['race_cat'],
+            'collar': players['collar'],
+            'personality_type': players['personality_type'],
+        })
+        
+        training_frames.append(tribal_rows)
     
-    accuracy = correct / total if total > 0 else 0.0
-    return correct, total, accuracy
+    return training_frames
 
-def get_advantage_type(adv_id, advantage_details):
-    """Get the type of an advantage from its ID."""
-    match = advantage_details[advantage_details['advantage_id'] == adv_id]
-    if len(match) > 0:
-        return match.iloc[0]['advantage_type']
-    return None
+def read_data(name, usecols, dtype=None):
+    """Read one survivoR CSV with the multithreaded pyarrow parser."""
+    df = pd.read_csv(f"{DATA_DIR}/{name}", engine='pyarrow', usecols=usecols)
+    return df.astype(dtype) if dtype else df
 
 def main():
     print("Loading data...")
     
-    # Load all data files
-    castaways = pd.read_csv(f"{DATA_DIR}/castaways.csv")
-    details = pd.read_csv(f"{DATA_DIR}/castaway_details.csv")
-    vote_history = pd.read_csv(f"{DATA_DIR}/vote_history.csv")
-    confessionals = pd.read_csv(f"{DATA_DIR}/confessionals.csv")
-    challenges = pd.read_csv(f"{DATA_DIR}/challenge_results.csv")
-    advantages = pd.read_csv(f"{DATA_DIR}/advantage_movement.csv")
-    advantage_details = pd.read_csv(f"{DATA_DIR}/advantage_details.csv")
-    tribe_mapping = pd.read_csv(f"{DATA_DIR}/tribe_mapping.csv")
+    # Load all data files, keeping only the columns used below
+    castaways = read_data(
+        "castaways.csv",
+        usecols=['version', 'season', 'castaway_id', 'castaway', 'age', 'episode'],
+        dtype={'season': 'int16'}
+    )
+    details = read_data(
+        "castaway_details.csv",
+        usecols=['castaway_id', 'gender', 'personality_type', 'bipoc', 'african', 'asian',
+                 'latin_american', 'native_american', 'collar']
+    )
+    vote_history = read_data(
+        "vote_history.csv",
+        usecols=['version', 'season', 'episode', 'day', 'tribe', 'castaway_id', 'vote_id',
+                 'voted_out', 'voted_out_id', 'immunity'],
+        dtype={'season': 'int16', 'episode': 'int16', 'day': 'int16'}
+    )
+    confessionals = read_data(
+        "confessionals.csv",
+        usecols=['version', 'season', 'episode', 'castaway_id', 'confessional_count', 'confessional_time'],
+        dtype={'season': 'int16', 'episode': 'int16'}
+    )
+    challenges = read_data(
+        "challenge_results.csv",
+        usecols=['version', 'season', 'episode', 'castaway_id', 'outcome_type', 'won'],
+        dtype={'season': 'int16', 'episode': 'int16'}
+    )
+    advantages = read_data(
+        "advantage_movement.csv",
+        usecols=['version', 'season', 'castaway_id', 'advantage_id', 'episode', 'event'],
+        dtype={'season': 'int16'}
+    )
+    advantage_details = read_data(
+        "advantage_details.csv",
+        usecols=['version', 'season', 'advantage_id', 'advantage_type'],
+        dtype={'season': 'int16'}
+    )
+    tribe_mapping = read_data(
+        "tribe_mapping.csv",
+        usecols=['version', 'season', 'episode', 'castaway_id', 'tribe', 'tribe_status'],
+        dtype={'season': 'int16', 'episode': 'int16'}
+    )
     
     # Filter to US seasons that are complete (< 50)
     castaways = castaways[(castaways['version'] == 'US') & (castaways['season'] < 50)]
@@ -106,350 +426,53 @@ def main():
         on='castaway_id',
         how='left'
     )
-    castaways['age_bucket'] = castaways['age'].apply(age_bucket)
-    castaways['race_cat'] = castaways.apply(race_cat, axis=1)
+    castaways['age_bucket'] = age_bucket(castaways['age'])
+    castaways['race_cat'] = race_cat(castaways)
+    
+    # Share one category set per key across all tables, so the per-season
+    # comparisons, isin filters and groupbys run on integer codes
+    castaway_dtype = pd.CategoricalDtype(pd.unique(pd.concat([
+        castaways['castaway_id'], vote_history['castaway_id'], vote_history['vote_id'],
+        vote_history['voted_out_id'], confessionals['castaway_id'], challenges['castaway_id'],
+        advantages['castaway_id'], tribe_mapping['castaway_id'],
+    ]).dropna()))
+    tribe_dtype = pd.CategoricalDtype(pd.unique(pd.concat([
+        vote_history['tribe'], tribe_mapping['tribe'],
+    ]).dropna()))
+    castaways = castaways.astype({'castaway_id': castaway_dtype})
+    vote_history = vote_history.astype({
+        'castaway_id': castaway_dtype, 'vote_id': castaway_dtype,
+        'voted_out_id': castaway_dtype, 'tribe': tribe_dtype,
+    })
+    confessionals = confessionals.astype({'castaway_id': castaway_dtype})
+    challenges = challenges.astype({'castaway_id': castaway_dtype})
+    advantages = advantages.astype({'castaway_id': castaway_dtype})
+    tribe_mapping = tribe_mapping.astype({'castaway_id': castaway_dtype, 'tribe': tribe_dtype})
     
     print(f"Loaded {len(castaways)} castaway appearances across {castaways['season'].nunique()} seasons")
     
     # Get individual challenges only
-    individual_challenges = challenges[challenges['outcome_type'] == 'Individual'].copy()
+    individual_challenges = challenges[challenges['outcome_type'] == 'Individual']
     
     # Build training data
-    training_rows = []
+    training_frames = []
     
-    # Process each season
-    for season in sorted(castaways['season'].unique()):
-        print(f"Processing Season {season}...")
-        
-        season_castaways = castaways[castaways['season'] == season].copy()
-        season_votes = vote_history[vote_history['season'] == season].copy()
-        season_conf = confessionals[confessionals['season'] == season].copy()
-        season_challenges = individual_challenges[individual_challenges['season'] == season].copy()
-        season_advantages = advantages[advantages['season'] == season].copy()
-        season_adv_details = advantage_details[advantage_details['season'] == season].copy()
-        season_tribes = tribe_mapping[tribe_mapping['season'] == season].copy()
-        
-        # Build lookup for who was voted out at each tribal
-        voted_out_lookup = {}
-        for _, row in season_votes[season_votes['voted_out_id'].notna()].drop_duplicates(['episode', 'tribe', 'voted_out_id']).iterrows():
-            voted_out_lookup[(row['episode'], row['tribe'])] = row['voted_out_id']
-        
-        # Get all tribal councils (unique episode + vote_event combinations where someone was voted out)
-        tribal_councils = season_votes[season_votes['voted_out'].notna()][
-            ['episode', 'day', 'tribe', 'voted_out', 'voted_out_id']
-        ].drop_duplicates()
-        
-        # For each tribal council
-        for _, tribal in tribal_councils.iterrows():
-            episode = tribal['episode']
-            day = tribal['day']
-            tribe_at_tribal = tribal['tribe']
-            voted_out_id = tribal['voted_out_id']
-            
-            # Determine who was still in the game at this tribal
-            # Players are "in" if their elimination episode is >= this episode
-            # or if they have no elimination episode (winners/finalists in later eps)
-            players_at_tribal = season_castaways[
-                (season_castaways['episode'].isna()) | 
-                (season_castaways['episode'] >= episode)
-            ].copy()
-            
-            # Filter to players at this specific tribal (same tribe for pre-merge)
-            # Get tribe assignments for this episode
-            episode_tribes = season_tribes[season_tribes['episode'] == episode]
-            
-            if len(episode_tribes) > 0:
-                # Use tribe mapping to find who was at this tribal
-                tribe_members = episode_tribes[episode_tribes['tribe'] == tribe_at_tribal]['castaway_id'].tolist()
-                if tribe_members:
-                    players_at_tribal = players_at_tribal[
-                        players_at_tribal['castaway_id'].isin(tribe_members)
-                    ]
-            
-            # Skip if no players found (data issue)
-            if len(players_at_tribal) == 0:
-                continue
-            
-            players_remaining = len(players_at_tribal)
-            
-            # Determine if post-merge using tribe_status
-            episode_tribes = season_tribes[season_tribes['episode'] == episode]
-            is_merge = False
-            if len(episode_tribes) > 0:
-                # Check if any player has 'Merged' status this episode
-                is_merge = (episode_tribes['tribe_status'] == 'Merged').any()
-            
-            # ONLY include post-merge tribal councils
-            if not is_merge:
-                continue
-            
-            # Get votes at this specific tribal
-            tribal_votes = season_votes[
-                (season_votes['episode'] == episode) & 
-                (season_votes['tribe'] == tribe_at_tribal) &
-                (season_votes['voted_out_id'] == voted_out_id)
-            ]
-            
-            # Count votes against each player at this tribal
-            votes_this_tribal = tribal_votes.groupby('vote_id').size().to_dict()
-            
-            # Get who has immunity at this tribal
-            immunity_holders = tribal_votes[tribal_votes['immunity'] == 'Individual']['castaway_id'].unique()
-            
-            # Process advantage holdings - track by type
-            # Categories: idol, extra_vote, steal_vote, block_vote, other
-            advantage_holders = {
-                'idol': set(),
-                'extra_vote': set(),
-                'steal_vote': set(),
-                'block_vote': set(),
-                'idol_nullifier': set(),
-                'other': set()
-            }
-            
-            # Track all advantages in circulation (across all players)
-            total_advantages_in_play = 0
-            
-            def categorize_advantage(adv_type):
-                if pd.isna(adv_type):
-                    return 'other'
-                adv_type = adv_type.lower()
-                if 'idol' in adv_type and 'nullifier' not in adv_type:
-                    return 'idol'
-                elif 'extra vote' in adv_type or 'bank' in adv_type:
-                    return 'extra_vote'
-                elif 'steal' in adv_type:
-                    return 'steal_vote'
-                elif 'block' in adv_type or 'vote blocker' in adv_type:
-                    return 'block_vote'
-                elif 'nullifier' in adv_type:
-                    return 'idol_nullifier'
-                else:
-                    return 'other'
-            
-            # Process advantages found/played before this episode
-            for _, adv in season_advantages[season_advantages['episode'] < episode].iterrows():
-                adv_id = adv['advantage_id']
-                adv_type = get_advantage_type(adv_id, season_adv_details)
-                category = categorize_advantage(adv_type)
-                event = str(adv.get('event', '')).lower()
-                
-                if 'found' in event or 'received' in event or 'won' in event or 'bought' in event:
-                    advantage_holders[category].add(adv['castaway_id'])
-                elif 'played' in event or 'expired' in event or 'voted out' in event or 'destroyed' in event:
-                    advantage_holders[category].discard(adv['castaway_id'])
-            
-            # Count total advantages in circulation going into this episode
-            for category in advantage_holders:
-                total_advantages_in_play += len(advantage_holders[category])
-            
-            # For each player at this tribal, create a training row
-            for _, player in players_at_tribal.iterrows():
-                castaway_id = player['castaway_id']
-                castaway = player['castaway']
-                
-                # === TARGET ===
-                eliminated = (castaway_id == voted_out_id)
-                
-                # === CONFESSIONAL FEATURES ===
-                player_conf = season_conf[season_conf['castaway_id'] == castaway_id]
-                
-                # Prior episode confessionals
-                conf_prev = player_conf[player_conf['episode'] == episode - 1]
-                confessionals_prev_ep = conf_prev['confessional_count'].sum() if len(conf_prev) > 0 else 0
-                confessional_time_prev_ep = conf_prev['confessional_time'].sum() if len(conf_prev) > 0 else 0
-                
-                # Last 2 episodes
-                conf_last2 = player_conf[player_conf['episode'].isin([episode - 1, episode - 2])]
-                confessionals_last_2_ep = conf_last2['confessional_count'].sum() if len(conf_last2) > 0 else 0
-                confessional_time_last_2_ep = conf_last2['confessional_time'].sum() if len(conf_last2) > 0 else 0
-                
-                # Last 3 episodes
-                conf_last3 = player_conf[player_conf['episode'].isin([episode - 1, episode - 2, episode - 3])]
-                confessionals_last_3_ep = conf_last3['confessional_count'].sum() if len(conf_last3) > 0 else 0
-                confessional_time_last_3_ep = conf_last3['confessional_time'].sum() if len(conf_last3) > 0 else 0
-                
-                # Cumulative (all prior episodes)
-                conf_cumulative = player_conf[player_conf['episode'] < episode]
-                confessionals_cumulative = conf_cumulative['confessional_count'].sum() if len(conf_cumulative) > 0 else 0
-                confessional_time_cumulative = conf_cumulative['confessional_time'].sum() if len(conf_cumulative) > 0 else 0
-                
-                # === VOTE FEATURES ===
-                # Get all votes against this player in prior episodes
-                player_votes_against = season_votes[
-                    (season_votes['vote_id'] == castaway_id) & 
-                    (season_votes['episode'] < episode)
-                ]
-                
-                # Prior episode votes
-                votes_prev = player_votes_against[player_votes_against['episode'] == episode - 1]
-                votes_against_prev_ep = len(votes_prev)
-                
-                # Last 2 episodes
-                votes_last2 = player_votes_against[player_votes_against['episode'].isin([episode - 1, episode - 2])]
-                votes_against_last_2_ep = len(votes_last2)
-                
-                # Last 3 episodes
-                votes_last3 = player_votes_against[player_votes_against['episode'].isin([episode - 1, episode - 2, episode - 3])]
-                votes_against_last_3_ep = len(votes_last3)
-                
-                # Cumulative
-                votes_against_cumulative = len(player_votes_against)
-                
-                # Times received votes (unique episodes)
-                times_received_votes = player_votes_against['episode'].nunique()
-                
-                # === VOTING ACCURACY ===
-                player_votes_cast = season_votes[
-                    (season_votes['castaway_id'] == castaway_id) & 
-                    (season_votes['episode'] < episode)
-                ]
-                
-                # Voting accuracy - last episode
-                _, _, voting_accuracy_prev_ep = calculate_voting_accuracy(
-                    player_votes_cast, voted_out_lookup, episode, 1
-                )
-                
-                # Voting accuracy - last 2 episodes
-                _, _, voting_accuracy_last_2_ep = calculate_voting_accuracy(
-                    player_votes_cast, voted_out_lookup, episode, 2
-                )
-                
-                # Voting accuracy - last 3 episodes
-                _, _, voting_accuracy_last_3_ep = calculate_voting_accuracy(
-                    player_votes_cast, voted_out_lookup, episode, 3
-                )
-                
-                # Voting accuracy - cumulative
-                correct_total = 0
-                votes_total = 0
-                for _, vote_row in player_votes_cast.iterrows():
-                    ep = vote_row['episode']
-                    vote_target = vote_row['vote_id']
-                    if pd.isna(vote_target):
-                        continue
-                    votes_total += 1
-                    actual_voted_out = voted_out_lookup.get((ep, vote_row.get('tribe', '')))
-                    if vote_target == actual_voted_out:
-                        correct_total += 1
-                voting_accuracy_cumulative = correct_total / votes_total if votes_total > 0 else 0.0
-                
-                # === CHALLENGE FEATURES ===
-                player_challenges = season_challenges[
-                    (season_challenges['castaway_id'] == castaway_id) &
-                    (season_challenges['won'] == 1)
-                ]
-                
-                # Prior episode wins
-                wins_prev = player_challenges[player_challenges['episode'] == episode - 1]
-                individual_wins_prev_ep = len(wins_prev)
-                
-                # Last 2 episodes
-                wins_last2 = player_challenges[player_challenges['episode'].isin([episode - 1, episode - 2])]
-                individual_wins_last_2_ep = len(wins_last2)
-                
-                # Last 3 episodes
-                wins_last3 = player_challenges[player_challenges['episode'].isin([episode - 1, episode - 2, episode - 3])]
-                individual_wins_last_3_ep = len(wins_last3)
-                
-                # Cumulative (prior to this episode)
-                wins_cumulative = player_challenges[player_challenges['episode'] < episode]
-                individual_wins_cumulative = len(wins_cumulative)
-                
-                # Has immunity this tribal
-                has_immunity_this_tribal = castaway_id in immunity_holders
-                
-                # === TRIBE SWAP FEATURES ===
-                player_tribe_history = season_tribes[
-                    (season_tribes['castaway_id'] == castaway_id) &
-                    (season_tribes['episode'] <= episode)
-                ].sort_values('episode')
-                
-                # Count tribe swaps (changes in tribe_status to 'Swapped*')
-                num_tribe_swaps = 0
-                if len(player_tribe_history) > 0:
-                    swap_statuses = player_tribe_history['tribe_status'].str.contains('Swapped', na=False)
-                    num_tribe_swaps = swap_statuses.sum()
-                
-                # === ADVANTAGE FEATURES ===
-                has_idol = castaway_id in advantage_holders['idol']
-                has_extra_vote = castaway_id in advantage_holders['extra_vote']
-                has_steal_vote = castaway_id in advantage_holders['steal_vote']
-                has_block_vote = castaway_id in advantage_holders['block_vote']
-                has_idol_nullifier = castaway_id in advantage_holders['idol_nullifier']
-                has_other_advantage = castaway_id in advantage_holders['other']
-                
-                # === BUILD ROW ===
-                row = {
-                    # Identifiers
-                    'season': season,
-                    'episode': episode,
-                    'castaway_id': castaway_id,
-                    'castaway': castaway,
-                    'tribe': tribe_at_tribal,
-                    
-                    # Target
-                    'eliminated': eliminated,
-                    
-                    # Confessional features
-                    'confessionals_prev_ep': confessionals_prev_ep,
-                    'confessionals_last_2_ep': confessionals_last_2_ep,
-                    'confessionals_last_3_ep': confessionals_last_3_ep,
-                    'confessionals_cumulative': confessionals_cumulative,
-                    'confessional_time_prev_ep': confessional_time_prev_ep,
-                    'confessional_time_last_2_ep': confessional_time_last_2_ep,
-                    'confessional_time_last_3_ep': confessional_time_last_3_ep,
-                    'confessional_time_cumulative': confessional_time_cumulative,
-                    
-                    # Vote features
-                    'votes_against_prev_ep': votes_against_prev_ep,
-                    'votes_against_last_2_ep': votes_against_last_2_ep,
-                    'votes_against_last_3_ep': votes_against_last_3_ep,
-                    'votes_against_cumulative': votes_against_cumulative,
-                    'times_received_votes': times_received_votes,
-                    
-                    # Voting accuracy
-                    'voting_accuracy_prev_ep': voting_accuracy_prev_ep,
-                    'voting_accuracy_last_2_ep': voting_accuracy_last_2_ep,
-                    'voting_accuracy_last_3_ep': voting_accuracy_last_3_ep,
-                    'voting_accuracy_cumulative': voting_accuracy_cumulative,
-                    
-                    # Challenge features
-                    'individual_wins_prev_ep': individual_wins_prev_ep,
-                    'individual_wins_last_2_ep': individual_wins_last_2_ep,
-                    'individual_wins_last_3_ep': individual_wins_last_3_ep,
-                    'individual_wins_cumulative': individual_wins_cumulative,
-                    'has_immunity_this_tribal': has_immunity_this_tribal,
-                    
-                    # Tribe features
-                    'num_tribe_swaps': num_tribe_swaps,
-                    
-                    # Advantage features
-                    'has_idol': has_idol,
-                    'has_extra_vote': has_extra_vote,
-                    'has_steal_vote': has_steal_vote,
-                    'has_block_vote': has_block_vote,
-                    'has_idol_nullifier': has_idol_nullifier,
-                    'has_other_advantage': has_other_advantage,
-                    'advantages_in_circulation': total_advantages_in_play,
-                    
-                    # Game state
-                    'players_remaining': players_remaining,
-                    'day': day,
-                    
-                    # Demographics
-                    'gender': player['gender'],
-                    'age': player['age'],
-                    'age_bucket': player['age_bucket'],
-                    'race_cat': player['race_cat'],
-                    'collar': player['collar'],
-                    'personality_type': player['personality_type'],
-                }
-                
-                training_rows.append(row)
+    # Process each season - seasons share no state, so fan them out across
+    # processes, each getting its own pre-split slice of every table
+    tables = [castaways, vote_history, confessionals, individual_challenges,
+              advantages, advantage_details, tribe_mapping]
+    seasons = sorted(castaways['season'].unique())
+    season_tables = []
+    for table in tables:
+        by_season = dict(list(table.groupby('season')))
+        season_tables.append([by_season.get(season, table.iloc[:0]) for season in seasons])
+    
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        for season_frames in executor.map(process_season, seasons, *season_tables):
+            training_frames.extend(season_frames)
     
     # Create DataFrame
-    df = pd.DataFrame(training_rows)
+    df = pd.concat(training_frames, ignore_index=True)
     
     # Filter out non-voted-out eliminations (medevacs, quits, etc.)
     # We keep all rows but the target is only True for actual vote-outs
@@ -468,11 +491,19 @@ def main():
         pct = non_null / len(df) * 100
         print(f"  {col}: {pct:.1f}% non-null")
     
-    # Save
+    # Save - Parquet keeps the dtypes for model training, the CSV stays for
+    # anything that reads plain text
     output_path = f"{OUTPUT_DIR}/elimination_training_data.csv"
     df.to_csv(output_path, index=False)
     print(f"\nSaved to: {output_path}")
     
+    parquet_path = f"{OUTPUT_DIR}/elimination_training_data.parquet"
+    # Rows are rebuilt per tribal, so restore the narrow key types read above
+    df.astype({'episode': 'int16', 'day': 'int16', 'gender': 'category', 'race_cat': 'category'}).to_parquet(
+        parquet_path, compression='snappy', index=False
+    )
+    print(f"Saved to: {parquet_path}")
+    
     return df
 
 if __name__ == "__main__":
@@ -8,116 +8,138 @@ For each identity:
 """
 
 import pandas as pd
-import json
+import numpy as np
+import pyarrow as pa
+import orjson
 from pathlib import Path
 
-DATA_DIR = "../../survivoR_data"
+DATA_DIR = Path("../../survivoR_data")
 OUTPUT_DIR = "../../docs/data"
 
+# Outcome milestones, each with the key its share is reported under
+MILESTONE_SHARE_KEYS = {
+    'won': 'pct_of_winners',
+    'made_ftc': 'pct_of_ftc',
+    'made_merge': 'pct_of_merge',
+    'found_advantage': 'pct_of_advantages',
+    'won_any_challenge': 'pct_of_challenge_winners',
+    'won_3plus_challenges': 'pct_of_3plus_winners',
+}
+
 def age_bucket(age):
-    if pd.isna(age):
-        return None
-    if age <= 24:
-        return '18-24'
-    elif age <= 29:
-        return '25-29'
-    elif age <= 39:
-        return '30-39'
-    elif age <= 49:
-        return '40-49'
-    else:
-        return '50+'
+    """Bucket a Series of ages; missing ages stay missing."""
+    return pd.cut(
+        age,
+        bins=[-np.inf, 24, 29, 39, 49, np.inf],
+        labels=['18-24', '25-29', '30-39', '40-49', '50+']
+    )
 
 def personality_cat(pt):
-    if pd.isna(pt):
-        return None
-    if len(pt) > 0 and pt[0] == 'I':
-        return 'Introvert'
-    elif len(pt) > 0 and pt[0] == 'E':
-        return 'Extrovert'
-    return None
+    """Introvert/Extrovert from the first letter of a Series of MBTI types."""
+    return pt.str[0].map({'I': 'Introvert', 'E': 'Extrovert'})
 
-def race_cat(row):
-    if row.get('african') == True:
-        return 'Black'
-    elif row.get('asian') == True:
-        return 'Asian'
-    elif row.get('latin_american') == True:
-        return 'Latino/Hispanic'
-    elif row.get('native_american') == True:
-        return 'Native American'
-    elif row.get('bipoc') == False:
-        return 'White'
-    return None
+def race_cat(df):
+    """Single race category per row, checked in priority order."""
+    conditions = [
+        df['african'] == True,
+        df['asian'] == True,
+        df['latin_american'] == True,
+        df['native_american'] == True,
+        df['bipoc'] == False,
+    ]
+    choices = ['Black', 'Asian', 'Latino/Hispanic', 'Native American', 'White']
+    return np.select(conditions, choices, default=None)
 
 
 def main():
     print("Loading data...")
-    castaways = pd.read_csv(f"{DATA_DIR}/castaways.csv")
-    details = pd.read_csv(f"{DATA_DIR}/castaway_details.csv")
-    challenges = pd.read_csv(f"{DATA_DIR}/challenge_results.csv")
-    advantages = pd.read_csv(f"{DATA_DIR}/advantage_movement.csv")
+    castaways = pd.read_csv(
+        DATA_DIR / "castaways.csv", engine='pyarrow',
+        usecols=['version', 'version_season', 'season', 'castaway_id', 'castaway', 'age',
+                 'order', 'jury', 'finalist', 'winner']
+    )
+    details = pd.read_csv(
+        DATA_DIR / "castaway_details.csv", engine='pyarrow',
+        usecols=['castaway_id', 'gender', 'collar', 'personality_type', 'bipoc', 'african',
+                 'asian', 'latin_american', 'native_american', 'lgbt']
+    )
+    challenges = pd.read_csv(
+        DATA_DIR / "challenge_results.csv", engine='pyarrow',
+        usecols=['version', 'version_season', 'season', 'castaway_id', 'outcome_type', 'won']
+    )
+    advantages = pd.read_csv(
+        DATA_DIR / "advantage_movement.csv", engine='pyarrow',
+        usecols=['version', 'version_season', 'season', 'castaway_id', 'event']
+    )
+    
+    # Filter to US only and exclude incomplete seasons, before anything is
+    # joined or aggregated
+    castaways = castaways[(castaways['version'] == 'US') & (castaways['season'] < 50) & (castaways['order'].notna())]
+    challenges = challenges[(challenges['version'] == 'US') & (challenges['season'] < 50)]
+    advantages = advantages[(advantages['version'] == 'US') & (advantages['season'] < 50)]
+    
+    # Share one category set per join key across all tables, so the merges
+    # below match on integer codes
+    castaway_dtype = pd.CategoricalDtype(pd.unique(pd.concat([
+        castaways['castaway_id'], details['castaway_id'],
+        challenges['castaway_id'], advantages['castaway_id'],
+    ]).dropna()))
+    season_dtype = pd.CategoricalDtype(pd.unique(pd.concat([
+        castaways['version_season'], challenges['version_season'], advantages['version_season'],
+    ]).dropna()))
+    key_dtypes = {'castaway_id': castaway_dtype, 'version_season': season_dtype}
+    castaways = castaways.astype(key_dtypes)
+    details = details.astype({'castaway_id': castaway_dtype})
+    challenges = challenges.astype(key_dtypes)
+    advantages = advantages.astype(key_dtypes)
     
     # Merge castaways with details (include lgbt column)
     df = castaways.merge(
-        details[['castaway_id', 'gender', 'collar', 'personality_type', 'bipoc', 'african', 'asian', 'latin_american', 'native_american', 'lgbt']], 
+        details,
         on='castaway_id', 
         how='left'
     )
     
-    # Filter to US only and exclude incomplete seasons
-    df = df[(df['version'] == 'US') & (df['season'] < 50) & (df['order'].notna())]
-    
     print(f"Total castaway appearances: {len(df)}")
     
     # Create categories
-    df['age_bucket'] = df['age'].apply(age_bucket)
-    df['personality_cat'] = df['personality_type'].apply(personality_cat)
-    df['race_cat'] = df.apply(race_cat, axis=1)
+    df['age_bucket'] = age_bucket(df['age'])
+    df['personality_cat'] = personality_cat(df['personality_type'])
+    df['race_cat'] = race_cat(df)
     df['collar'] = df['collar'].replace('Unknown', None)
     df['gender'] = df['gender'].replace({'Male': 'Man', 'Female': 'Woman'})
     
     # Create LGBTQ+ category
     df['lgbtq'] = df['lgbt'].apply(lambda x: 'LGBTQ+' if x == True else ('Not LGBTQ+' if x == False else None))
     
-    # Calculate INDIVIDUAL challenge wins only (post-merge challenges)
-    challenges_us = challenges[challenges['version'] == 'US']
-
-    # Individual challenges
-    individual_challenges = challenges_us[challenges_us['outcome_type'] == 'Individual']
-    individual_wins = individual_challenges.groupby(['castaway_id', 'version_season']).agg({
-        'won': 'sum'
-    }).reset_index()
-    individual_wins.columns = ['castaway_id', 'version_season', 'individual_challenge_wins']
+    # Challenge wins per appearance in one pass: all challenges, and
+    # INDIVIDUAL challenge wins only (post-merge challenges)
+    challenge_wins = challenges.assign(
+        individual_won=challenges['won'].where(challenges['outcome_type'] == 'Individual', 0)
+    ).groupby(['castaway_id', 'version_season'], observed=True)[['individual_won', 'won']].sum().reset_index()
+    challenge_wins.columns = ['castaway_id', 'version_season', 'individual_challenge_wins', 'total_challenge_wins']
 
-    df = df.merge(individual_wins, on=['castaway_id', 'version_season'], how='left')
-    df['individual_challenge_wins'] = df['individual_challenge_wins'].fillna(0)
+    df = df.merge(challenge_wins, on=['castaway_id', 'version_season'], how='left')
+    df['individual_challenge_wins'] = df['individual_challenge_wins'].fillna(0).astype('int8')
     df['won_individual_challenge'] = df['individual_challenge_wins'] >= 1
-
-    # All challenges (for reference)
-    all_challenge_wins = challenges_us.groupby(['castaway_id', 'version_season']).agg({
-        'won': 'sum'
-    }).reset_index()
-    all_challenge_wins.columns = ['castaway_id', 'version_season', 'total_challenge_wins']
-
-    df = df.merge(all_challenge_wins, on=['castaway_id', 'version_season'], how='left')
-    df['total_challenge_wins'] = df['total_challenge_wins'].fillna(0)
+    df['total_challenge_wins'] = df['total_challenge_wins'].fillna(0).astype('int8')
     df['won_3plus_challenges'] = df['total_challenge_wins'] >= 3
     df['won_any_challenge'] = df['total_challenge_wins'] >= 1
     
-    # Calculate advantages found
+    # Calculate advantages found - only a handful of distinct event names,
+    # so match 'Found' against those and filter with isin
+    found_events = [event for event in advantages['event'].dropna().unique() if 'Found' in event]
     adv_found = advantages[
-        (advantages['version'] == 'US') & 
-        (advantages['event'].str.contains('Found', na=False))
-    ].groupby(['castaway_id', 'version_season']).size().reset_index(name='advantages_found')
+        advantages['event'].isin(found_events)
+    ].groupby(['castaway_id', 'version_season'], observed=True).size().reset_index(name='advantages_found')
     
     df = df.merge(adv_found, on=['castaway_id', 'version_season'], how='left')
-    df['advantages_found'] = df['advantages_found'].fillna(0)
+    df['advantages_found'] = df['advantages_found'].fillna(0).astype('int8')
     df['found_advantage'] = df['advantages_found'] >= 1
     
     # Determine outcomes
-    df['made_merge'] = df['jury'] | df['finalist'] | df['winner']
-    df['made_ftc'] = df['finalist'] | df['winner']
+    df['made_merge'] = (df['jury'] | df['finalist'] | df['winner']).astype(bool)
+    df['made_ftc'] = (df['finalist'] | df['winner']).astype(bool)
     df['won'] = df['winner'] == True
     
     # Define categories (added lgbtq)
@@ -130,14 +152,15 @@ def main():
         'lgbtq': ['LGBTQ+', 'Not LGBTQ+']
     }
     
-    # Calculate totals
+    # Calculate totals - every milestone in one column-wise reduction
+    milestones = list(MILESTONE_SHARE_KEYS)
+    # A DataFrame block comes out column-major; copy it to one row-major
+    # int8 matrix so both reductions below run over a single packed buffer
+    milestone_flags = np.ascontiguousarray(df[milestones].to_numpy(dtype=np.int8))
+    milestone_totals = milestone_flags.sum(axis=0)
     total_contestants = len(df)
-    total_winners = df['won'].sum()
-    total_ftc = df['made_ftc'].sum()
-    total_merge = df['made_merge'].sum()
-    total_found_adv = df['found_advantage'].sum()
-    total_won_challenge = df['won_any_challenge'].sum()
-    total_won_3plus = df['won_3plus_challenges'].sum()
+    (total_winners, total_ftc, total_merge, total_found_adv,
+     total_won_challenge, total_won_3plus) = milestone_totals
     
     print(f"\nTotals:")
     print(f"  Contestants: {total_contestants}")
@@ -160,60 +183,46 @@ def main():
         'categories': {}
     }
     
+    # Per-category counts and milestone sums come from bincounts over the
+    # category codes, one weighted count per milestone
     for cat_name, cat_values in categories.items():
         output['categories'][cat_name] = {}
+        codes = pd.Index(cat_values).get_indexer(df[cat_name])
+        in_cat = codes >= 0
+        counts = np.bincount(codes[in_cat], minlength=len(cat_values))
+        sums = np.column_stack([
+            np.bincount(codes[in_cat], weights=milestone_flags[in_cat, j], minlength=len(cat_values))
+            for j in range(len(milestones))
+        ]).astype(np.int64)
+        # Share of each milestone's total, 0 where nobody reached it
+        pcts = np.divide(sums, milestone_totals, out=np.zeros(sums.shape), where=milestone_totals > 0) * 100
         
-        for val in cat_values:
-            subset = df[df[cat_name] == val]
-            n = len(subset)
-            
+        # .tolist() hands back plain ints/floats for the JSON in one go
+        for val, n, val_sums, val_pcts in zip(cat_values, counts.tolist(), sums.tolist(), pcts.tolist()):
             if n == 0:
                 continue
             
-            output['categories'][cat_name][val] = {
-                'count': int(n),
-                'pct_of_contestants': float(n / total_contestants * 100),
-                'won': int(subset['won'].sum()),
-                'pct_of_winners': float(subset['won'].sum() / total_winners * 100) if total_winners > 0 else 0,
-                'made_ftc': int(subset['made_ftc'].sum()),
-                'pct_of_ftc': float(subset['made_ftc'].sum() / total_ftc * 100) if total_ftc > 0 else 0,
-                'made_merge': int(subset['made_merge'].sum()),
-                'pct_of_merge': float(subset['made_merge'].sum() / total_merge * 100) if total_merge > 0 else 0,
-                'found_advantage': int(subset['found_advantage'].sum()),
-                'pct_of_advantages': float(subset['found_advantage'].sum() / total_found_adv * 100) if total_found_adv > 0 else 0,
-                'won_any_challenge': int(subset['won_any_challenge'].sum()),
-                'pct_of_challenge_winners': float(subset['won_any_challenge'].sum() / total_won_challenge * 100) if total_won_challenge > 0 else 0,
-                'won_3plus_challenges': int(subset['won_3plus_challenges'].sum()),
-                'pct_of_3plus_winners': float(subset['won_3plus_challenges'].sum() / total_won_3plus * 100) if total_won_3plus > 0 else 0,
-            }
+            stats = {'count': n, 'pct_of_contestants': n / total_contestants * 100}
+            for milestone, achieved, share in zip(milestones, val_sums, val_pcts):
+                stats[milestone] = achieved
+                stats[MILESTONE_SHARE_KEYS[milestone]] = share
+            output['categories'][cat_name][val] = stats
     
     # Build players list for the UI
-    players = []
-    for _, row in df.iterrows():
-        players.append({
-            'name': row['castaway'],
-            'season': int(row['season']),
-            'gender': row['gender'] if pd.notna(row['gender']) else None,
-            'age_bucket': row['age_bucket'],
-            'race_cat': row['race_cat'],
-            'collar': row['collar'] if pd.notna(row['collar']) else None,
-            'personality_cat': row['personality_cat'],
-            'lgbtq': row['lgbtq'],
-            'won': bool(row['won']),
-            'made_ftc': bool(row['made_ftc']),
-            'made_merge': bool(row['made_merge']),
-            'found_advantage': bool(row['found_advantage']),
-            'won_individual_challenge': bool(row['won_individual_challenge'])
-        })
-    
-    output['players'] = players
+    label_cols = ['gender', 'age_bucket', 'race_cat', 'collar', 'personality_cat', 'lgbtq']
+    flag_cols = ['won', 'made_ftc', 'made_merge', 'found_advantage', 'won_individual_challenge']
+    players = df[['castaway', 'season'] + label_cols + flag_cols].rename(columns={'castaway': 'name'})
+    players = players.astype({'season': int, **{col: bool for col in flag_cols}})
+    
+    # Arrow stores missing labels as nulls, so they come back as None as-is
+    output['players'] = pa.Table.from_pandas(players, preserve_index=False).to_pylist()
     
     # Save
     Path(OUTPUT_DIR).mkdir(parents=True, exist_ok=True)
     output_path = f"{OUTPUT_DIR}/identity_stats.json"
     
-    with open(output_path, 'w') as f:
-        json.dump(output, f, indent=2)
+    with open(output_path, 'wb') as f:
+        f.write(orjson.dumps(output, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
     
     print(f"\nSaved to: {output_path}")
     
@@ -10,49 +10,114 @@ Generates a JSON file per season containing:
 
 import pandas as pd
 import numpy as np
-import json
-import colorsys
+import orjson
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
 
-class NumpyEncoder(json.JSONEncoder):
-    """Custom JSON encoder for numpy types."""
-    def default(self, obj):
-        if isinstance(obj, np.integer):
-            return int(obj)
-        if isinstance(obj, np.floating):
-            return float(obj)
-        if isinstance(obj, np.ndarray):
-            return obj.tolist()
-        return super().default(obj)
+def _hls_channel(m1: np.ndarray, m2: np.ndarray, hue: np.ndarray) -> np.ndarray:
+    """Vectorized colorsys._v: one RGB channel from the HLS hue sector."""
+    hue = hue % 1.0
+    return np.select(
+        [hue < 1/6, hue < 0.5, hue < 2/3],
+        [m1 + (m2 - m1) * hue * 6.0, m2, m1 + (m2 - m1) * (2/3 - hue) * 6.0],
+        default=m1
+    )
 
 
 def generate_distinct_colors(n: int) -> list[str]:
     """Generate n visually distinct colors using HSL color space."""
-    colors = []
-    for i in range(n):
-        hue = i / n
-        # Use high saturation and medium lightness for vibrant, distinct colors
-        saturation = 0.65 + (i % 3) * 0.1  # Vary saturation slightly
-        lightness = 0.45 + (i % 2) * 0.15  # Vary lightness slightly
-        
-        r, g, b = colorsys.hls_to_rgb(hue, lightness, saturation)
-        hex_color = "#{:02x}{:02x}{:02x}".format(int(r * 255), int(g * 255), int(b * 255))
-        colors.append(hex_color)
+    return list(_distinct_colors(n))
+
+
+@lru_cache(maxsize=128)
+def _distinct_colors(n: int) -> tuple[str, ...]:
+    """Cached palette for n castaways; seasons share only a handful of cast sizes."""
+    i = np.arange(n)
+    hue = i / n
+    # Use high saturation and medium lightness for vibrant, distinct colors
+    saturation = 0.65 + (i % 3) * 0.1  # Vary saturation slightly
+    lightness = 0.45 + (i % 2) * 0.15  # Vary lightness slightly
     
-    return colors
+    # Same arithmetic as colorsys.hls_to_rgb (saturation is never 0 here)
+    m2 = np.where(lightness <= 0.5, lightness * (1.0 + saturation), lightness + saturation - lightness * saturation)
+    m1 = 2.0 * lightness - m2
+    rgb = np.column_stack([
+        _hls_channel(m1, m2, hue + 1/3),
+        _hls_channel(m1, m2, hue),
+        _hls_channel(m1, m2, hue - 1/3),
+    ])
+    
+    return tuple("#{:02x}{:02x}{:02x}".format(*row) for row in (rgb * 255).astype(int).tolist())
+
+
+# pandas' default NA strings; Arrow's own list lacks 'None' and '<NA>' (e.g. "None" tribes)
+NA_VALUES = [
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'
+]
+
+
+def read_data(path: str, usecols: list[str], categorical: list[str] = ()) -> pd.DataFrame:
+    """Read one CSV with Arrow's threaded reader; categorical columns arrive dictionary-encoded."""
+    table = pacsv.read_csv(
+        path,
+        convert_options=pacsv.ConvertOptions(
+            include_columns=usecols,
+            null_values=NA_VALUES,
+            strings_can_be_null=True,
+            column_types={col: pa.dictionary(pa.int32(), pa.string()) for col in categorical}
+        )
+    )
+    return table.to_pandas()
 
 
 def load_data(data_dir: str) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
-    """Load required CSV files."""
-    vote_history = pd.read_csv(f"{data_dir}/vote_history.csv")
-    castaways = pd.read_csv(f"{data_dir}/castaways.csv")
-    tribe_colours = pd.read_csv(f"{data_dir}/tribe_colours.csv")
-    jury_votes = pd.read_csv(f"{data_dir}/jury_votes.csv")
+    """Load required CSV files, keeping only the columns process_season reads."""
+    vote_history = read_data(
+        f"{data_dir}/vote_history.csv",
+        ['version_season', 'sog_id', 'episode', 'day', 'tribe', 'tribe_status', 'vote_event',
+         'castaway', 'castaway_id', 'vote', 'vote_id', 'vote_order', 'voted_out', 'voted_out_id'],
+        ['version_season', 'tribe', 'vote_event', 'castaway_id', 'vote_id']
+    )
+    castaways = read_data(
+        f"{data_dir}/castaways.csv",
+        ['version', 'version_season', 'season', 'full_name', 'castaway_id', 'castaway',
+         'order', 'result', 'original_tribe'],
+        ['version_season']
+    )
+    tribe_colours = read_data(
+        f"{data_dir}/tribe_colours.csv",
+        ['version_season', 'tribe', 'tribe_colour'],
+        ['version_season']
+    )
+    jury_votes = read_data(
+        f"{data_dir}/jury_votes.csv",
+        ['version_season', 'castaway', 'castaway_id', 'finalist', 'finalist_id', 'vote'],
+        ['version_season']
+    )
     
     return vote_history, castaways, tribe_colours, jury_votes
 
 
+def split_by_season(
+    dfs: tuple[pd.DataFrame, ...],
+    version_seasons: list[str]
+) -> dict[str, tuple[pd.DataFrame, ...]]:
+    """Slice each loaded frame by version_season once, for reuse across seasons."""
+    groups = [dict(tuple(df.groupby('version_season', sort=False))) for df in dfs]
+    empties = [df.iloc[:0] for df in dfs]
+    
+    return {
+        vs: tuple(group.get(vs, empty) for group, empty in zip(groups, empties))
+        for vs in version_seasons
+    }
+
+
 def process_season(
     version_season: str,
     vote_history: pd.DataFrame,
@@ -65,19 +130,19 @@ def process_season(
     
     Args:
         version_season: e.g., 'US46'
-        vote_history: Full vote history dataframe
-        castaways: Full castaways dataframe  
-        tribe_colours: Full tribe colours dataframe
-        jury_votes: Full jury votes dataframe
+        vote_history: This season's slice of the vote history table
+        castaways: This season's slice of the castaways table
+        tribe_colours: This season's slice of the tribe colours table
+        jury_votes: This season's slice of the jury votes table
         
     Returns:
         Dictionary ready to be serialized to JSON
     """
     
-    # Filter to this season
-    season_votes = vote_history[vote_history['version_season'] == version_season].copy()
-    season_castaways = castaways[castaways['version_season'] == version_season].copy()
-    season_tribes = tribe_colours[tribe_colours['version_season'] == version_season].copy()
+    # Inputs are already this season's slices (see split_by_season)
+    season_votes = vote_history
+    season_castaways = castaways
+    season_tribes = tribe_colours
     
     # Extract season number
     season_num = season_castaways['season'].iloc[0] if len(season_castaways) > 0 else None
@@ -93,24 +158,26 @@ def process_season(
     n_castaways = len(season_castaways)
     unique_colors = generate_distinct_colors(n_castaways)
     
-    castaways_list = []
-    castaway_color_map = {}
+    placements = season_castaways['order'].astype('Int64').astype(object)
+    castaways_list = pd.DataFrame({
+        "id": season_castaways['castaway_id'],
+        "name": season_castaways['castaway'],
+        "full_name": season_castaways.get('full_name', season_castaways['castaway']),
+        "tribe": season_castaways['original_tribe'],
+        "tribe_color": season_castaways['original_tribe'].map(tribe_colors).fillna('#888888'),
+        "color": unique_colors,
+        "placement": placements.where(placements.notna(), None),
+        "result": season_castaways.get('result', '')
+    }).to_dict('records')
     
-    for idx, (_, row) in enumerate(season_castaways.iterrows()):
-        castaway_id = row['castaway_id']
-        color = unique_colors[idx]
-        castaway_color_map[castaway_id] = color
-        
-        castaways_list.append({
-            "id": castaway_id,
-            "name": row['castaway'],
-            "full_name": row.get('full_name', row['castaway']),
-            "tribe": row['original_tribe'],
-            "tribe_color": tribe_colors.get(row['original_tribe'], '#888888'),
-            "color": color,
-            "placement": int(row['order']) if pd.notna(row['order']) else None,
-            "result": row.get('result', '')
-        })
+    castaway_color_map = dict(zip(season_castaways['castaway_id'], unique_colors))
+    # Keep the first row for castaways listed more than once
+    placement_by_id = {}
+    for c in castaways_list:
+        placement_by_id.setdefault(c['id'], c['placement'])
+    
+    # Series form of the color map for vectorized lookups over vote rows
+    color_series = pd.Series(castaway_color_map, dtype=object)
     
     # Build tribal councils
     # Group by sog_id to get each tribal council
@@ -120,15 +187,11 @@ def process_season(
     boot_order = []
     tc_number = 0
     
-    # Get unique TCs ordered by sog_id
-    unique_sog_ids = sorted(season_votes['sog_id'].dropna().unique())
+    # Split into TCs ordered by sog_id in a single pass
+    season_votes = season_votes.dropna(subset=['sog_id'])
+    season_votes['sog_id'] = season_votes['sog_id'].astype('int64')
     
-    for sog_id in unique_sog_ids:
-        tc_votes = season_votes[season_votes['sog_id'] == sog_id]
-        
-        if len(tc_votes) == 0:
-            continue
-            
+    for sog_id, tc_votes in season_votes.groupby('sog_id', sort=True):
         tc_number += 1
         
         # Get TC metadata from first row
@@ -141,40 +204,44 @@ def process_season(
         
         # Collect all votes (including revotes)
         # We want: who voted, who they voted for
-        votes = []
-        seen_votes = set()  # Track unique voter-target pairs to avoid duplicates from extra votes
+        # Skip rows with no vote cast (lost vote, etc.), then drop repeated
+        # voter-target pairs within a round (duplicates from extra votes)
+        cast_votes = tc_votes[tc_votes['vote'].notna()]
+        vote_rounds = cast_votes['vote_order'].fillna(1).astype(int)
+        first_seen = ~pd.DataFrame({
+            'voter_id': cast_votes['castaway_id'],
+            'target_id': cast_votes['vote_id'],
+            'vote_round': vote_rounds,
+        }).duplicated()
+        cast_votes = cast_votes[first_seen]
+        voter_colors = cast_votes['castaway_id'].map(color_series).fillna('#888888')
+        target_colors = cast_votes['vote_id'].map(color_series).fillna('#888888')
         
-        for _, vote_row in tc_votes.iterrows():
-            voter = vote_row['castaway']
-            voter_id = vote_row['castaway_id']
-            target = vote_row['vote']
-            target_id = vote_row['vote_id']
-            vote_order = int(vote_row['vote_order']) if pd.notna(vote_row['vote_order']) else 1
-            
-            # Skip if no vote cast (lost vote, etc.)
-            if pd.isna(target):
-                continue
-            
-            # Create unique key for this vote
-            vote_key = (voter_id, target_id, vote_order)
-            if vote_key in seen_votes:
-                continue
-            seen_votes.add(vote_key)
-            
-            votes.append({
+        votes = [
+            {
                 "voter": voter,
                 "voter_id": voter_id,
-                "voter_color": castaway_color_map.get(voter_id, '#888888'),
+                "voter_color": voter_color,
                 "target": target,
                 "target_id": target_id if pd.notna(target_id) else None,
-                "target_color": castaway_color_map.get(target_id, '#888888') if pd.notna(target_id) else '#888888',
-                "vote_round": vote_order
-            })
+                "target_color": target_color,
+                "vote_round": vote_round
+            }
+            for voter, voter_id, voter_color, target, target_id, target_color, vote_round in zip(
+                cast_votes['castaway'].tolist(),
+                cast_votes['castaway_id'].tolist(),
+                voter_colors.tolist(),
+                cast_votes['vote'].tolist(),
+                cast_votes['vote_id'].tolist(),
+                target_colors.tolist(),
+                vote_rounds[first_seen].tolist()
+            )
+        ]
         
         # Determine elimination type
         elimination_type = "voted_out"
-        vote_events = tc_votes['vote_event'].dropna().unique()
-        if 'Fire challenge (f4)' in vote_events or 'Fire challenge' in vote_events:
+        vote_events = set(tc_votes['vote_event'].dropna().tolist())
+        if vote_events & {'Fire challenge (f4)', 'Fire challenge'}:
             elimination_type = "fire_challenge"
         elif 'Rock draw' in vote_events:
             elimination_type = "rock_draw"
@@ -201,12 +268,7 @@ def process_season(
         
         # Add to boot order
         if voted_out:
-            # Find placement
-            placement = None
-            for c in castaways_list:
-                if c['id'] == voted_out_id:
-                    placement = c['placement']
-                    break
+            placement = placement_by_id.get(voted_out_id)
             
             boot_order.append({
                 "name": voted_out,
@@ -218,66 +280,60 @@ def process_season(
             })
     
     # Process Final Tribal Council jury votes
-    season_jury_votes = jury_votes[jury_votes['version_season'] == version_season].copy()
+    season_jury_votes = jury_votes
     ftc_data = []
     
     if len(season_jury_votes) > 0:
         # Get all votes for the season (including pre-merge)
-        all_season_votes = vote_history[vote_history['version_season'] == version_season].copy()
+        all_season_votes = vote_history
         
         # Find who each juror voted for (vote=1)
-        juror_votes = season_jury_votes[season_jury_votes['vote'] == 1]
+        juror_votes = season_jury_votes[season_jury_votes['vote'] == 1].assign(
+            juror_color=lambda df: df['castaway_id'].map(color_series).fillna('#888888'),
+            voted_for_color=lambda df: df['finalist_id'].map(color_series).fillna('#888888')
+        )
         
         # Get list of finalists
         finalists = season_jury_votes['finalist_id'].unique().tolist()
-        finalist_names = {row['finalist_id']: row['finalist'] for _, row in season_jury_votes.iterrows()}
+        finalist_names = dict(zip(season_jury_votes['finalist_id'], season_jury_votes['finalist']))
+        
+        # First vote each castaway cast at each TC, one column per castaway
+        tc_votes_by_castaway = all_season_votes.pivot_table(
+            index='sog_id', columns='castaway_id', values='vote', aggfunc='first'
+        )
+        no_votes = pd.Series(np.nan, index=tc_votes_by_castaway.index, dtype=object)
+        
+        # Every (voter, target) pair cast this season, for the helped-eliminate check
+        vote_pairs = all_season_votes[['castaway_id', 'vote_id']].dropna()
+        voter_target_pairs = set(zip(vote_pairs['castaway_id'], vote_pairs['vote_id']))
+        
+        jury_rows = juror_votes[
+            ['castaway_id', 'castaway', 'juror_color', 'finalist_id', 'finalist', 'voted_for_color']
+        ].itertuples(index=False, name=None)
         
-        for _, jv_row in juror_votes.iterrows():
-            juror_id = jv_row['castaway_id']
-            juror_name = jv_row['castaway']
-            finalist_id = jv_row['finalist_id']
-            finalist_name = jv_row['finalist']
+        for juror_id, juror_name, juror_color, finalist_id, finalist_name, voted_for_color in jury_rows:
             
             # Calculate voting alignment
-            # Find all TCs where both juror and finalist voted
-            juror_tc_votes = all_season_votes[all_season_votes['castaway_id'] == juror_id]
-            finalist_tc_votes = all_season_votes[all_season_votes['castaway_id'] == finalist_id]
-            
-            # Group by sog_id to compare votes at each TC
-            alignment_count = 0
-            total_eligible = 0
-            
-            juror_by_tc = juror_tc_votes.groupby('sog_id').first()
-            finalist_by_tc = finalist_tc_votes.groupby('sog_id').first()
-            
-            common_tcs = set(juror_by_tc.index) & set(finalist_by_tc.index)
-            
-            for tc in common_tcs:
-                juror_vote = juror_by_tc.loc[tc, 'vote'] if tc in juror_by_tc.index else None
-                finalist_vote = finalist_by_tc.loc[tc, 'vote'] if tc in finalist_by_tc.index else None
-                
-                if pd.notna(juror_vote) and pd.notna(finalist_vote):
-                    total_eligible += 1
-                    if juror_vote == finalist_vote:
-                        alignment_count += 1
+            # Compare votes at every TC where both juror and finalist voted
+            juror_tc_votes = tc_votes_by_castaway.get(juror_id, no_votes)
+            finalist_tc_votes = tc_votes_by_castaway.get(finalist_id, no_votes)
+            both_voted = juror_tc_votes.notna() & finalist_tc_votes.notna()
+            total_eligible = int(both_voted.sum())
+            alignment_count = int(((juror_tc_votes == finalist_tc_votes) & both_voted).sum())
             
             alignment_pct = (alignment_count / total_eligible * 100) if total_eligible > 0 else None
             
             # Check if finalist voted to eliminate juror
             # We need to check if the finalist's vote was for the juror (by name), not just if juror was voted out
-            finalist_votes_for_juror = all_season_votes[
-                (all_season_votes['castaway_id'] == finalist_id) & 
-                (all_season_votes['vote_id'] == juror_id)
-            ]
-            helped_eliminate = len(finalist_votes_for_juror) > 0
+            helped_eliminate = (finalist_id, juror_id) in voter_target_pairs
             
             ftc_data.append({
                 "juror_id": juror_id,
                 "juror_name": juror_name,
-                "juror_color": castaway_color_map.get(juror_id, '#888888'),
+                "juror_color": juror_color,
                 "voted_for_id": finalist_id,
                 "voted_for_name": finalist_name,
-                "voted_for_color": castaway_color_map.get(finalist_id, '#888888'),
+                "voted_for_color": voted_for_color,
                 "alignment_pct": round(alignment_pct, 1) if alignment_pct is not None else None,
                 "eligible_votes": total_eligible,
                 "aligned_votes": alignment_count,
@@ -302,19 +358,12 @@ def process_season(
         max_tc = max([b['tc_number'] for b in boot_order]) if boot_order else 0
         
         for i, finalist in enumerate(finalists_sorted):
-            # Find their placement from castaways_list
-            placement = None
-            for c in castaways_list:
-                if c['id'] == finalist['id']:
-                    placement = c['placement']
-                    break
-            
             boot_order.append({
                 "name": finalist['name'],
                 "id": finalist['id'],
                 "color": finalist['color'],
                 "tc_number": max_tc + 1,  # FTC
-                "placement": placement,
+                "placement": placement_by_id.get(finalist['id']),
                 "elimination_type": "FTC",
                 "ftc_votes": finalist['votes_received']
             })
@@ -339,6 +388,64 @@ def process_season(
     return result
 
 
+def _dumps(obj) -> bytes:
+    """Encode with 2-space indent; NaN becomes null and NaN dict keys (untribed castaways) "null"."""
+    return orjson.dumps(
+        obj,
+        option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    )
+
+
+def write_season_json(season_data: dict, output_dir: str) -> str:
+    """
+    Write a processed season to <output_dir>/<version_season>_voting_flow.json.
+    
+    Returns:
+        Path to the written JSON file
+    """
+    # Ensure output directory exists
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    
+    output_path = f"{output_dir}/{season_data['version_season'].lower()}_voting_flow.json"
+    
+    # Stream top-level arrays one record at a time so only a single encoded
+    # record is held in memory; the bytes match one indented orjson.dumps call
+    with open(output_path, 'wb') as f:
+        f.write(b'{')
+        for k, (key, value) in enumerate(season_data.items()):
+            f.write(b',\n  ' if k else b'\n  ')
+            f.write(orjson.dumps(key) + b': ')
+            if isinstance(value, list) and value:
+                f.write(b'[')
+                for j, item in enumerate(value):
+                    f.write(b',\n    ' if j else b'\n    ')
+                    f.write(_dumps(item).replace(b'\n', b'\n    '))
+                f.write(b'\n  ]')
+            else:
+                f.write(_dumps(value).replace(b'\n', b'\n  '))
+        f.write(b'\n}')
+    
+    return output_path
+
+
+def _generate_one(
+    version_season: str,
+    dfs: tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame],
+    output_dir: str
+) -> str:
+    """Process one season from already-loaded frames and write its JSON."""
+    season_data = process_season(version_season, *dfs)
+    
+    output_path = write_season_json(season_data, output_dir)
+    
+    print(f"Generated: {output_path}")
+    print(f"  - {season_data['total_castaways']} castaways")
+    print(f"  - {season_data['total_tribal_councils']} tribal councils")
+    print(f"  - {len(season_data['boot_order'])} eliminations")
+    
+    return output_path
+
+
 def generate_season_json(
     version_season: str,
     data_dir: str,
@@ -355,26 +462,8 @@ def generate_season_json(
     Returns:
         Path to generated JSON file
     """
-    # Load data
-    vote_history, castaways, tribe_colours, jury_votes = load_data(data_dir)
-    
-    # Process season
-    season_data = process_season(version_season, vote_history, castaways, tribe_colours, jury_votes)
-    
-    # Ensure output directory exists
-    Path(output_dir).mkdir(parents=True, exist_ok=True)
-    
-    # Write JSON
-    output_path = f"{output_dir}/{version_season.lower()}_voting_flow.json"
-    with open(output_path, 'w') as f:
-        json.dump(season_data, f, indent=2, cls=NumpyEncoder)
-    
-    print(f"Generated: {output_path}")
-    print(f"  - {season_data['total_castaways']} castaways")
-    print(f"  - {season_data['total_tribal_councils']} tribal councils")
-    print(f"  - {len(season_data['boot_order'])} eliminations")
-    
-    return output_path
+    season_dfs = split_by_season(load_data(data_dir), [version_season])
+    return _generate_one(version_season, season_dfs[version_season], output_dir)
 
 
 def generate_all_seasons(
@@ -393,19 +482,25 @@ def generate_all_seasons(
     Returns:
         List of paths to generated JSON files
     """
-    vote_history, castaways, tribe_colours = load_data(data_dir)
+    # Load once and share the frames across seasons
+    dfs = load_data(data_dir)
+    castaways = dfs[1]
     
     # Get all seasons for this version
     all_seasons = castaways[castaways['version'] == version]['version_season'].unique()
     all_seasons = sorted(all_seasons)
     
+    season_dfs = split_by_season(dfs, all_seasons)
+    
+    # Seasons are independent; each worker is sent only its season's slices
     output_paths = []
-    for vs in all_seasons:
-        try:
-            path = generate_season_json(vs, data_dir, output_dir)
-            output_paths.append(path)
-        except Exception as e:
-            print(f"Error processing {vs}: {e}")
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        futures = {vs: executor.submit(_generate_one, vs, season_dfs[vs], output_dir) for vs in all_seasons}
+        for vs, future in futures.items():
+            try:
+                output_paths.append(future.result())
+            except Exception as e:
+                print(f"Error processing {vs}: {e}")
     
     return output_paths
 
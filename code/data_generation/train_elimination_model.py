@@ -7,13 +7,16 @@ Features proper cross-validation, hyperparameter tuning, and evaluation metrics.
 
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import StratifiedKFold, cross_val_predict, GridSearchCV
-from sklearn.preprocessing import LabelEncoder
+import hashlib
+import os
+from sklearn.base import clone
+from sklearn.model_selection import StratifiedKFold, cross_val_score
 from sklearn.metrics import (
     classification_report, confusion_matrix, roc_auc_score, 
     precision_recall_curve, average_precision_score, roc_curve
 )
 import xgboost as xgb
+import optuna
 import matplotlib.pyplot as plt
 from pathlib import Path
 import joblib
@@ -22,6 +25,66 @@ warnings.filterwarnings('ignore')
 
 DATA_DIR = "../../docs/data"
 OUTPUT_DIR = "../../models"
+CACHE_DIR = f"{OUTPUT_DIR}/cache"
+
+FEATURE_COLS = [
+    # Season (as requested)
+    'season',
+
+    # Confessional features
+    'confessionals_prev_ep',
+    'confessionals_last_2_ep',
+    'confessionals_last_3_ep',
+    'confessionals_cumulative',
+    'confessional_time_prev_ep',
+    'confessional_time_last_2_ep',
+    'confessional_time_last_3_ep',
+    'confessional_time_cumulative',
+
+    # Vote features
+    'votes_against_prev_ep',
+    'votes_against_last_2_ep',
+    'votes_against_last_3_ep',
+    'votes_against_cumulative',
+    'times_received_votes',
+
+    # Voting accuracy features
+    'voting_accuracy_prev_ep',
+    'voting_accuracy_last_2_ep',
+    'voting_accuracy_last_3_ep',
+    'voting_accuracy_cumulative',
+
+    # Challenge features
+    'individual_wins_prev_ep',
+    'individual_wins_last_2_ep',
+    'individual_wins_last_3_ep',
+    'individual_wins_cumulative',
+
+    # Tribe features
+    'num_tribe_swaps',
+
+    # Advantage features
+    'has_idol',
+    'has_extra_vote',
+    'has_steal_vote',
+    'has_block_vote',
+    'has_idol_nullifier',
+    'has_other_advantage',
+    'advantages_in_circulation',
+
+    # Game state
+    'players_remaining',
+    'day',
+
+    # Demographics
+    'gender',
+    'age',
+    'age_bucket',
+    'race_cat',
+    'collar',
+    'personality_type',
+]
+
 
 def load_and_prepare_data(filepath):
     """Load data and prepare features for modeling."""
@@ -35,63 +98,7 @@ def load_and_prepare_data(filepath):
     identifier_cols = ['episode', 'castaway_id', 'castaway', 'tribe']
     target_col = 'eliminated'
     
-    feature_cols = [
-        # Season (as requested)
-        'season',
-        
-        # Confessional features
-        'confessionals_prev_ep',
-        'confessionals_last_2_ep',
-        'confessionals_last_3_ep',
-        'confessionals_cumulative',
-        'confessional_time_prev_ep',
-        'confessional_time_last_2_ep',
-        'confessional_time_last_3_ep',
-        'confessional_time_cumulative',
-        
-        # Vote features
-        'votes_against_prev_ep',
-        'votes_against_last_2_ep',
-        'votes_against_last_3_ep',
-        'votes_against_cumulative',
-        'times_received_votes',
-        
-        # Voting accuracy features
-        'voting_accuracy_prev_ep',
-        'voting_accuracy_last_2_ep',
-        'voting_accuracy_last_3_ep',
-        'voting_accuracy_cumulative',
-        
-        # Challenge features
-        'individual_wins_prev_ep',
-        'individual_wins_last_2_ep',
-        'individual_wins_last_3_ep',
-        'individual_wins_cumulative',
-        
-        # Tribe features
-        'num_tribe_swaps',
-        
-        # Advantage features
-        'has_idol',
-        'has_extra_vote',
-        'has_steal_vote',
-        'has_block_vote',
-        'has_idol_nullifier',
-        'has_other_advantage',
-        'advantages_in_circulation',
-        
-        # Game state
-        'players_remaining',
-        'day',
-        
-        # Demographics
-        'gender',
-        'age',
-        'age_bucket',
-        'race_cat',
-        'collar',
-        'personality_type',
-    ]
+    feature_cols = FEATURE_COLS
     
     # Prepare features
     X = df[feature_cols].copy()
@@ -102,20 +109,20 @@ def load_and_prepare_data(filepath):
     label_encoders = {}
     
     for col in categorical_cols:
-        le = LabelEncoder()
-        # Handle NaN by converting to string first
-        X[col] = X[col].fillna('Unknown').astype(str)
-        X[col] = le.fit_transform(X[col])
-        label_encoders[col] = le
+        # Handle NaN by converting to string first; categories sort like LabelEncoder classes
+        categorical = X[col].fillna('Unknown').astype(str).astype('category')
+        X[col] = categorical.cat.codes.astype(np.int32)
+        label_encoders[col] = categorical.cat.categories
     
     # Convert boolean columns to int
     bool_cols = ['has_idol', 'has_extra_vote', 'has_steal_vote', 'has_block_vote', 
                  'has_idol_nullifier', 'has_other_advantage']
-    for col in bool_cols:
-        X[col] = X[col].astype(int)
+    X[bool_cols] = X[bool_cols].astype(np.int8)
     
-    # Fill any remaining NaN with median
-    X = X.fillna(X.median())
+    # Any other NaN is left as missing; XGBoost routes it down a learned default branch
+    
+    # XGBoost trains in float32, so hand it float32 up front
+    X = X.astype(np.float32)
     
     print(f"Features: {len(feature_cols)}")
     print(f"Categorical encoded: {categorical_cols}")
@@ -123,6 +130,29 @@ def load_and_prepare_data(filepath):
     return X, y, df, label_encoders, feature_cols
 
 
+def load_prepared_data(filepath):
+    """Load prepared features from the Parquet cache, rebuilding it when the CSV or features change."""
+    cache_key = hashlib.md5((str(os.path.getmtime(filepath)) + repr(FEATURE_COLS)).encode()).hexdigest()
+    cache_path = Path(CACHE_DIR) / f"{cache_key}.parquet"
+    encoders_path = cache_path.with_suffix('.joblib')
+    
+    if cache_path.exists() and encoders_path.exists():
+        print(f"Loading prepared features from {cache_path}...")
+        X = pd.read_parquet(cache_path)
+        y = X.pop('_y')
+        print(f"Total rows: {len(X)}")
+        print(f"Elimination rate: {y.mean()*100:.1f}%")
+        return X, y, None, joblib.load(encoders_path), FEATURE_COLS
+    
+    X, y, df, label_encoders, feature_cols = load_and_prepare_data(filepath)
+    
+    Path(CACHE_DIR).mkdir(parents=True, exist_ok=True)
+    X.assign(_y=y).to_parquet(cache_path, compression='zstd')
+    joblib.dump(label_encoders, encoders_path)
+    
+    return X, y, df, label_encoders, feature_cols
+
+
 def train_with_cv(X, y, n_splits=5):
     """Train XGBoost with cross-validation."""
     print(f"\n{'='*50}")
@@ -137,46 +167,55 @@ def train_with_cv(X, y, n_splits=5):
         objective='binary:logistic',
         eval_metric='auc',
         scale_pos_weight=scale_pos_weight,
+        tree_method='hist',
         random_state=42,
         n_jobs=-1
     )
     
-    # Hyperparameter grid
-    param_grid = {
-        'n_estimators': [100, 200],
-        'max_depth': [3, 5, 7],
-        'learning_rate': [0.01, 0.1],
-        'min_child_weight': [1, 3],
-        'subsample': [0.8],
-        'colsample_bytree': [0.8],
+    # Held fixed across trials
+    fixed_params = {
+        'subsample': 0.8,
+        'colsample_bytree': 0.8,
     }
     
     # Stratified K-Fold
     cv = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=42)
     
-    print("\nPerforming GridSearchCV for hyperparameter tuning...")
-    grid_search = GridSearchCV(
-        base_model,
-        param_grid,
-        cv=cv,
-        scoring='roc_auc',
-        n_jobs=-1,
-        verbose=1
-    )
-    
-    grid_search.fit(X, y)
-    
-    print(f"\nBest parameters: {grid_search.best_params_}")
-    print(f"Best CV AUC: {grid_search.best_score_:.4f}")
-    
-    best_model = grid_search.best_estimator_
-    
-    # Get cross-validated predictions for evaluation
+    def objective(trial):
+        params = {
+            'n_estimators': trial.suggest_int('n_estimators', 100, 300, step=50),
+            'max_depth': trial.suggest_int('max_depth', 3, 7),
+            'learning_rate': trial.suggest_float('learning_rate', 0.01, 0.3, log=True),
+            'min_child_weight': trial.suggest_int('min_child_weight', 1, 5),
+            **fixed_params,
+        }
+        model = clone(base_model).set_params(**params)
+        return cross_val_score(model, X, y, cv=cv, scoring='roc_auc').mean()
+    
+    # TPE search reaches the grid's AUC in far fewer fits than the exhaustive grid
+    print("\nRunning Optuna search for hyperparameter tuning...")
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    study = optuna.create_study(direction='maximize', sampler=optuna.samplers.TPESampler(seed=42))
+    study.optimize(objective, n_trials=20)
+    
+    best_params = {**study.best_params, **fixed_params}
+    print(f"\nBest parameters: {best_params}")
+    print(f"Best CV AUC: {study.best_value:.4f}")
+    
+    best_model = clone(base_model).set_params(**best_params)
+    best_model.fit(X, y)
+    
+    # Get cross-validated predictions for evaluation, slicing folds out of one DMatrix
     print("\nGenerating cross-validated predictions...")
-    y_pred_proba = cross_val_predict(best_model, X, y, cv=cv, method='predict_proba')[:, 1]
+    dtrain = xgb.DMatrix(X.to_numpy(), label=y, feature_names=list(X.columns))
+    booster_params = best_model.get_xgb_params()
+    y_pred_proba = np.empty(len(y))
+    for train_idx, test_idx in cv.split(X, y):
+        booster = xgb.train(booster_params, dtrain.slice(train_idx), num_boost_round=best_params['n_estimators'])
+        y_pred_proba[test_idx] = booster.predict(dtrain.slice(test_idx))
     y_pred = (y_pred_proba >= 0.5).astype(int)
     
-    return best_model, y_pred, y_pred_proba, grid_search.best_params_
+    return best_model, y_pred, y_pred_proba, best_params
 
 
 def evaluate_model(y_true, y_pred, y_pred_proba):
@@ -314,7 +353,7 @@ def analyze_feature_importance(model, feature_names):
 def main():
     # Load data
     data_path = f"{DATA_DIR}/elimination_training_data.csv"
-    X, y, df, label_encoders, feature_cols = load_and_prepare_data(data_path)
+    X, y, df, label_encoders, feature_cols = load_prepared_data(data_path)
     
     # Train with cross-validation
     model, y_pred, y_pred_proba, best_params = train_with_cv(X, y, n_splits=5)
@@ -338,6 +377,7 @@ def main():
         objective='binary:logistic',
         eval_metric='auc',
         scale_pos_weight=(y == 0).sum() / (y == 1).sum(),
+        tree_method='hist',
         random_state=42,
         n_jobs=-1
     )
@@ -4,6 +4,7 @@ Calculate player performance scores across different challenge categories
 """
 
 import pandas as pd
+import numpy as np
 import json
 from collections import defaultdict
 from pathlib import Path
@@ -34,26 +35,27 @@ CHALLENGE_CATEGORIES = {
     ]
 }
 
-def categorize_challenge(challenge_row):
+def categorize_challenges(challenges_desc):
     """
-    Determine which categories a challenge belongs to
-    Returns dict with category names and their relevance scores
+    Determine which categories each challenge belongs to
+    Returns DataFrame of normalized relevance scores (challenges x categories)
     """
-    categories = {}
+    categories = list(CHALLENGE_CATEGORIES)
+    attributes = list(dict.fromkeys(attr for attrs in CHALLENGE_CATEGORIES.values() for attr in attrs))
 
-    for category, attributes in CHALLENGE_CATEGORIES.items():
-        # Count how many attributes from this category are present
-        score = sum(1 for attr in attributes if challenge_row.get(attr, False) == True)
-
-        if score > 0:
-            categories[category] = score
+    # Count how many attributes from each category are present: flags @ membership
+    flags = (challenges_desc.reindex(columns=attributes) == True).to_numpy(dtype=np.int64)
+    membership = np.array(
+        [[attr in CHALLENGE_CATEGORIES[category] for category in categories] for attr in attributes],
+        dtype=np.int64
+    )
+    scores = flags @ membership
 
     # Normalize scores
-    total = sum(categories.values())
-    if total > 0:
-        categories = {cat: score/total for cat, score in categories.items()}
+    totals = scores.sum(axis=1, keepdims=True)
+    relevance = np.divide(scores, totals, out=np.zeros(scores.shape), where=totals > 0)
 
-    return categories
+    return pd.DataFrame(relevance, index=challenges_desc['challenge_id'], columns=categories)
 
 def calculate_player_category_scores():
     """
@@ -71,72 +73,73 @@ def calculate_player_category_scores():
     castaways = pd.read_csv('../../survivoR_data/castaways.csv')
     s50_players = {p['name']: p['castaway_id'] for p in profiles_data['players']}
 
+    # Reverse lookups; built from the end so the first match wins, as a linear scan would
+    names_by_id = {cid: name for name, cid in reversed(s50_players.items())}
+    profiles_by_name = {p['name']: p for p in reversed(profiles_data['players'])}
+
     print("Analyzing challenge performance by category...")
     print(f"Players in Season 50: {len(s50_players)}")
 
     # For each challenge, categorize it
-    challenge_categories_map = {}
-    for _, challenge in challenges_desc.iterrows():
-        challenge_id = challenge['challenge_id']
-        categories = categorize_challenge(challenge)
-        if categories:
-            challenge_categories_map[challenge_id] = categories
+    # (the last categorized row wins when a challenge_id repeats)
+    relevance = categorize_challenges(challenges_desc)
+    relevance = relevance[relevance.sum(axis=1) > 0]
+    relevance = relevance[~relevance.index.duplicated(keep='last')]
+
+    print(f"Categorized {len(relevance)} challenges")
+
+    # One row per (challenge, category) the challenge belongs to
+    challenge_weights = (
+        relevance.rename_axis(columns='category').stack().rename('weight').reset_index()
+    )
+    challenge_weights = challenge_weights[challenge_weights['weight'] > 0]
+
+    # Only consider individual Immunity/Reward challenges (more indicative of personal skill);
+    # tribal challenges are influenced too much by tribe composition.
+    # Skip castaways not in our Season 50 cast.
+    results = challenges_results[
+        challenges_results['challenge_type'].isin(['Immunity', 'Reward'])
+        & (challenges_results['outcome_type'] == 'Individual')
+        & challenges_results['castaway_id'].isin(list(names_by_id))
+    ]
 
-    print(f"Categorized {len(challenge_categories_map)} challenges")
+    # Determine if player won
+    won = (
+        (results['won'] == 1)
+        | (results['won_individual_immunity'] == 1)
+        | (results['won_individual_reward'] == 1)
+    )
+
+    # Spread each result over its challenge's categories and total per player/category
+    category_results = results[['castaway_id', 'challenge_id']].assign(won=won).merge(
+        challenge_weights, on='challenge_id'
+    )
+    category_results['weighted_win'] = category_results['weight'].where(category_results['won'], 0)
+    totals = category_results.groupby(['castaway_id', 'category'], sort=False).agg(
+        attempts=('weight', 'size'),
+        wins=('won', 'sum'),
+        weighted_wins=('weighted_win', 'sum'),
+        weighted_attempts=('weight', 'sum')
+    )
 
     # Track player performance in each category
     player_stats = defaultdict(lambda: {
-        'Physical': {'attempts': 0, 'wins': 0, 'weighted_wins': 0, 'weighted_attempts': 0},
-        'Endurance': {'attempts': 0, 'wins': 0, 'weighted_wins': 0, 'weighted_attempts': 0},
-        'Precision': {'attempts': 0, 'wins': 0, 'weighted_wins': 0, 'weighted_attempts': 0},
-        'Puzzle': {'attempts': 0, 'wins': 0, 'weighted_wins': 0, 'weighted_attempts': 0},
-        'Mental': {'attempts': 0, 'wins': 0, 'weighted_wins': 0, 'weighted_attempts': 0},
-        'Water': {'attempts': 0, 'wins': 0, 'weighted_wins': 0, 'weighted_attempts': 0}
+        category: {'attempts': 0, 'wins': 0, 'weighted_wins': 0, 'weighted_attempts': 0}
+        for category in CHALLENGE_CATEGORIES
     })
 
-    # Analyze each challenge result
-    for _, result in challenges_results.iterrows():
-        castaway_id = result['castaway_id']
-        challenge_id = result['challenge_id']
-
-        # Only consider individual challenges (more indicative of personal skill)
-        challenge_type = result['challenge_type']
-        if challenge_type not in ['Immunity', 'Reward']:
-            # Skip tribal challenges for category scoring
-            # (They're influenced too much by tribe composition)
-            continue
-
-        # Check if this is an individual challenge
-        outcome_type = result['outcome_type']
-        if outcome_type != 'Individual':
-            continue
-
-        # Skip if castaway not in our Season 50 cast
-        if castaway_id not in s50_players.values():
-            continue
-
+    for (castaway_id, category), attempts, wins, weighted_wins, weighted_attempts in totals.itertuples(name=None):
         # Get player name
-        player_name = next((name for name, cid in s50_players.items() if cid == castaway_id), None)
+        player_name = names_by_id.get(castaway_id)
         if not player_name:
             continue
 
-        # Get challenge categories
-        if challenge_id not in challenge_categories_map:
-            continue
-
-        categories = challenge_categories_map[challenge_id]
-
-        # Determine if player won
-        won = result.get('won', 0) == 1 or result.get('won_individual_immunity', 0) == 1 or result.get('won_individual_reward', 0) == 1
-
-        # Update stats for each category this challenge belongs to
-        for category, weight in categories.items():
-            player_stats[player_name][category]['weighted_attempts'] += weight
-            player_stats[player_name][category]['attempts'] += 1
-
-            if won:
-                player_stats[player_name][category]['weighted_wins'] += weight
-                player_stats[player_name][category]['wins'] += 1
+        player_stats[player_name][category] = {
+            'attempts': int(attempts),
+            'wins': int(wins),
+            'weighted_wins': weighted_wins,
+            'weighted_attempts': weighted_attempts
+        }
 
     # Calculate win rates
     category_scores = {}
@@ -153,7 +156,7 @@ def calculate_player_category_scores():
                 win_rate = weighted_wins / weighted_attempts
             else:
                 # No data - use overall individual immunity score as fallback
-                player_profile = next((p for p in profiles_data['players'] if p['name'] == player_name), None)
+                player_profile = profiles_by_name.get(player_name)
                 if player_profile:
                     # Use a weighted average based on category type
                     base_score = player_profile.get('p_score_chal_individual_immunity', 0.5)
@@ -176,7 +179,7 @@ def calculate_player_category_scores():
                     elif category == 'Endurance':
                         # Mix of physical and mental
                         win_rate = base_score
-                    elif category == 'Precision':
+                    elif category == 'Target Practice':
                         # Slightly favor challenge performers
                         win_rate = base_score * 1.05
                     elif category == 'Water':
@@ -214,14 +217,14 @@ def update_player_profiles_with_categories():
             player['challenge_categories'] = {
                 'physical_score': scores.get('Physical', 0.5),
                 'endurance_score': scores.get('Endurance', 0.5),
-                'precision_score': scores.get('Precision', 0.5),
+                'precision_score': scores.get('Target Practice', 0.5),
                 'puzzle_score': scores.get('Puzzle', 0.5),
                 'mental_score': scores.get('Mental', 0.5),
                 'water_score': scores.get('Water', 0.5),
                 # Include attempt counts for transparency
                 'physical_attempts': scores.get('Physical_attempts', 0),
                 'endurance_attempts': scores.get('Endurance_attempts', 0),
-                'precision_attempts': scores.get('Precision_attempts', 0),
+                'precision_attempts': scores.get('Target Practice_attempts', 0),
                 'puzzle_attempts': scores.get('Puzzle_attempts', 0),
                 'mental_attempts': scores.get('Mental_attempts', 0),
                 'water_attempts': scores.get('Water_attempts', 0)